@@ -4,34 +4,159 @@
 This script provides convenient ways to run different types of tests.
 """
 
+import os
 import sys
 import subprocess
 from pathlib import Path
 
 
-def run_command(cmd: list[str], description: str) -> bool:
-    """Run a command and return True if successful."""
+def run_command(cmd: list[str], description: str, use_subprocess: bool = False) -> bool:
+    """Run a command and return True if successful.
+
+    Commands have the form ``uv run pytest <args>``. Unless `use_subprocess` is set,
+    pytest is called in-process with ``<args>``, which saves starting a new
+    interpreter; the working directory is changed to the repository for the run
+    and restored afterwards. If pytest is not importable here, the command is run as is.
+    With PYVOLGRID_IMPORTTIME=1 the command always runs in a subprocess under
+    ``python -X importtime`` to report slow imports.
+    """
     print(f"\n{'=' * 60}")
     print(f"Running: {description}")
     print(f"Command: {' '.join(cmd)}")
     print("=" * 60)
 
-    try:
-        result = subprocess.run(cmd, cwd=Path(__file__).parent, check=True)
-        print(f"✅ {description} passed!")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed with exit code {e.returncode}")
-        return False
+    # -X importtime only applies to a freshly started interpreter
+    if os.environ.get("PYVOLGRID_IMPORTTIME") == "1":
+        cmd = [*cmd[:2], "python", "-X", "importtime", "-m", *cmd[2:]]
+        use_subprocess = True
+
+    if not use_subprocess:
+        try:
+            import pytest
+        except ImportError:
+            use_subprocess = True
+
+    if use_subprocess:
+        try:
+            subprocess.run(cmd, cwd=Path(__file__).parent, env=os.environ, check=True)
+        except subprocess.CalledProcessError as e:
+            print(f"❌ {description} failed with exit code {e.returncode}")
+            return False
+    else:
+        cwd = os.getcwd()
+        os.chdir(Path(__file__).parent)
+        try:
+            return_code = pytest.main(cmd[3:])
+        finally:
+            os.chdir(cwd)
+        if return_code != 0:
+            print(f"❌ {description} failed with exit code {int(return_code)}")
+            return False
+
+    print(f"✅ {description} passed!")
+    return True
+
+
+# Marker expression selecting every test. The pytest configuration deselects slow tests unless
+# a marker expression is given, so selections that include slow tests must say so explicitly.
+ALL_MARKERS = "slow or not slow"
+
+# Marker expressions that cannot select slow tests. Slow tests include wall-clock timing
+# tests, which competing xdist workers would skew, so any other expression runs serially.
+PARALLEL_MARKERS = {"not slow", "fast"}
+
+# Tests selected by each stackable command: (test paths, marker expression, keyword expression).
+# No paths means the whole suite and a keyword expression of None means no keyword filter.
+SELECTIONS: dict[str, tuple[list[str], str, str | None]] = {
+    "all": ([], ALL_MARKERS, None),
+    "fast": ([], "fast", None),
+    "slow": ([], "slow", None),
+    "validation": (["tests/test_input_validation.py"], ALL_MARKERS, None),
+    "calculation": (["tests/test_volume_calculation.py"], ALL_MARKERS, None),
+    "edge": (["tests/test_edge_cases.py"], "not slow", None),
+    "flexible": (["tests/test_flexible_interface.py"], ALL_MARKERS, None),
+    "arrays": (["tests/test_array_requirements.py"], ALL_MARKERS, None),
+    "scalar": ([], ALL_MARKERS, "scalar_radius"),
+}
+
+DESCRIPTIONS = {
+    "all": "All tests",
+    "fast": "Fast edge-case tests only",
+    "slow": "Slow tests only",
+    "validation": "Input validation tests",
+    "calculation": "Volume calculation tests",
+    "edge": "Edge case tests",
+    "flexible": "Flexible interface tests",
+    "arrays": "Array requirements tests",
+    "scalar": "Scalar radius tests",
+}
+
+
+def _or(a: str, b: str) -> str:
+    """Join two filter expressions with 'or'."""
+    return a if a == b else f"({a}) or ({b})"
+
+
+def merge_selections(
+    a: tuple[list[str], str, str | None], b: tuple[list[str], str, str | None]
+) -> tuple[list[str], str, str | None] | None:
+    """Combine two selections into one that selects the union of their tests.
+
+    Returns None if the union cannot be expressed as a single pytest invocation,
+    i.e. if the selections differ in more than one of paths, markers and keywords.
+    """
+    paths_a, marker_a, keyword_a = a
+    paths_b, marker_b, keyword_b = b
+    same_paths = sorted(paths_a) == sorted(paths_b)
+
+    if marker_a == marker_b and keyword_a == keyword_b:
+        paths = [] if not paths_a or not paths_b else paths_a + [p for p in paths_b if p not in paths_a]
+        return paths, marker_a, keyword_a
+    if same_paths and keyword_a == keyword_b:
+        return paths_a, _or(marker_a, marker_b), keyword_a
+    if same_paths and marker_a == marker_b:
+        # without a keyword filter every test matches, so the union has none either
+        keyword = None if keyword_a is None or keyword_b is None else _or(keyword_a, keyword_b)
+        return paths_a, marker_a, keyword
+    return None
 
 
 def main():
-    """Main test runner."""
-    if len(sys.argv) < 2:
-        print("Usage: python run_tests.py <command>")
+    """Main test runner.
+
+    Several of the selection commands (see SELECTIONS) can be given at once, e.g.
+    ``python run_tests.py validation calculation``. They are combined into as few
+    pytest runs as possible, so collection and plugin startup are paid once per run
+    instead of once per command.
+    """
+    options = {"--serial", "--use-subprocess"}
+    args = [arg for arg in sys.argv[1:] if arg not in options]
+    serial = "--serial" in sys.argv
+    use_subprocess = "--use-subprocess" in sys.argv
+
+    # Test runs are mostly ephemeral (CI containers), so writing .pyc files is wasted IO.
+    # A fixed hash seed keeps subprocesses and xdist workers reproducible.
+    os.environ.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+    os.environ.setdefault("PYTHONHASHSEED", "0")
+    sys.dont_write_bytecode = bool(os.environ["PYTHONDONTWRITEBYTECODE"])
+
+    def run(cmd: list[str], description: str) -> bool:
+        return run_command(cmd, description, use_subprocess)
+
+    # Tests run in parallel through pytest-xdist unless --serial is given. Set
+    # PYVOLGRID_TEST_WORKERS to a number (0 disables xdist) on machines with few
+    # cores, where the worker startup can outweigh the gain.
+    parallel = [] if serial else ["-n", os.environ.get("PYVOLGRID_TEST_WORKERS", "auto")]
+
+    # CI runs start from a clean checkout, so writing the pytest cache there is wasted
+    # work. Locally the cache is kept, since the 'lf' and 'failed' commands read it.
+    no_cache = ["-p", "no:cacheprovider"] if os.environ.get("CI") else []
+
+    if len(args) < 1:
+        print("Usage: python run_tests.py <command> [<command> ...] [--serial] [--use-subprocess]")
         print("\nAvailable commands:")
         print("  all          - Run all tests")
-        print("  fast         - Run fast tests only")
+        print("  fast         - Run the tests marked fast (edge cases without grid work)")
         print("  slow         - Run slow tests only")
         print("  coverage     - Run tests with coverage report")
         print("  validation   - Run input validation tests only")
@@ -40,29 +165,56 @@ def main():
         print("  flexible     - Run flexible interface tests only")
         print("  arrays       - Run array requirements tests only")
         print("  scalar       - Run scalar radius tests only")
-        print("  single <test> - Run a single test")
+        print("  single <test> - Run the tests matching a name (slow ones included)")
+        print("  lf           - Rerun only the tests that failed in the last run (slow ones included)")
+        print("  failed       - Run all tests (slow ones included), previously failed ones first")
+        print("\nCommands from 'all' to 'scalar' can be combined and share one pytest run where possible.")
+        print("\nTests run in parallel (pytest-xdist) for 'fast', 'edge' and 'coverage', which exclude slow tests;")
+        print("runs that can include slow (timing) tests are serial.")
+        print("  --serial     - Run tests in a single process")
+        print("  PYVOLGRID_TEST_WORKERS=<n> - Number of worker processes (default: auto)")
+        print("\nTests run in this interpreter unless pytest is not installed here.")
+        print("  --use-subprocess - Run pytest through 'uv run' in a separate process")
+        print("  PYVOLGRID_IMPORTTIME=1 - Run pytest under 'python -X importtime' to diagnose slow imports")
+        print("\nPYTHONDONTWRITEBYTECODE=1 and PYTHONHASHSEED=0 are set unless already defined.")
+        print("\nThe pytest cache that 'lf' and 'failed' rely on is not written when CI is set.")
         return 1
 
-    command = sys.argv[1].lower()
+    command = args[0].lower()
 
-    if command == "all":
-        success = run_command(
-            ["uv", "run", "pytest", "-v"],
-            "All tests (excluding slow)",
-        )
+    if all(arg.lower() in SELECTIONS for arg in args):
+        # Merge the selections into groups that can each be run by one pytest call
+        groups: list[tuple[list[str], tuple[list[str], str, str | None]]] = []
+        for name in dict.fromkeys(arg.lower() for arg in args):
+            for i, (names, selection) in enumerate(groups):
+                merged = merge_selections(selection, SELECTIONS[name])
+                if merged is not None:
+                    groups[i] = (names + [name], merged)
+                    break
+            else:
+                groups.append(([name], SELECTIONS[name]))
 
-    elif command == "fast":
-        success = run_command(
-            ["uv", "run", "pytest", "-v", "-m", "not slow"], "Fast tests only"
-        )
+        # Test modules, fixtures and the grid pool of an in-process pytest run stay loaded
+        # afterwards, so several groups each get a fresh interpreter to stay independent
+        if len(groups) > 1:
+            use_subprocess = True
 
-    elif command == "slow":
-        success = run_command(
-            ["uv", "run", "pytest", "-v", "-m", "slow"], "Slow tests only"
-        )
+        success = True
+        for names, (paths, marker, keyword) in groups:
+            cmd = ["uv", "run", "pytest", *paths, "-v", "-m", marker]
+            if keyword is not None:
+                cmd += ["-k", keyword]
+            if marker in PARALLEL_MARKERS:
+                cmd += parallel
+            cmd += no_cache
+            success = run(cmd, " + ".join(DESCRIPTIONS[name] for name in names)) and success
+
+    elif len(args) > 1 and command != "single":
+        print(f"Only the commands {', '.join(SELECTIONS)} can be combined")
+        return 1
 
     elif command == "coverage":
-        success = run_command(
+        success = run(
             [
                 "uv",
                 "run",
@@ -73,59 +225,38 @@ def main():
                 "-v",
                 "-m",
                 "not slow",
+                *parallel,
+                *no_cache,
             ],
             "Tests with coverage",
         )
         if success:
             print("\n📊 Coverage report generated in htmlcov/index.html")
 
-    elif command == "validation":
-        success = run_command(
-            ["uv", "run", "pytest", "tests/test_input_validation.py", "-v"],
-            "Input validation tests",
-        )
-
-    elif command == "calculation":
-        success = run_command(
-            ["uv", "run", "pytest", "tests/test_volume_calculation.py", "-v"],
-            "Volume calculation tests",
-        )
-
-    elif command == "edge":
-        success = run_command(
-            ["uv", "run", "pytest", "tests/test_edge_cases.py", "-v", "-m", "not slow"],
-            "Edge case tests",
-        )
-
-    elif command == "flexible":
-        success = run_command(
-            ["uv", "run", "pytest", "tests/test_flexible_interface.py", "-v"],
-            "Flexible interface tests",
-        )
-
-    elif command == "arrays":
-        success = run_command(
-            ["uv", "run", "pytest", "tests/test_array_requirements.py", "-v"],
-            "Array requirements tests",
+    elif command == "lf":
+        success = run(
+            ["uv", "run", "pytest", "-v", "-m", ALL_MARKERS, "--lf", "--last-failed-no-failures", "none"],
+            "Last-failed tests",
         )
 
-    elif command == "scalar":
-        success = run_command(
-            ["uv", "run", "pytest", "-v", "-k", "scalar_radius"],
-            "Scalar radius tests",
+    elif command == "failed":
+        # includes the slow tests, so it runs serially (see PARALLEL_MARKERS)
+        success = run(
+            ["uv", "run", "pytest", "-v", "-m", ALL_MARKERS, "--ff"],
+            "All tests, failed first",
         )
 
     elif command == "single":
-        if len(sys.argv) < 3:
+        if len(args) < 2:
             print("Usage: python run_tests.py single <test_name>")
             print(
-                "Example: python run_tests.py single test_single_sphere_volume_approximation"
+                "Example: python run_tests.py single test_single_sphere_convergence"
             )
             return 1
 
-        test_name = sys.argv[2]
-        success = run_command(
-            ["uv", "run", "pytest", "-v", "-k", test_name], f"Single test: {test_name}"
+        test_name = args[1]
+        success = run(
+            ["uv", "run", "pytest", "-v", "-m", ALL_MARKERS, "-k", test_name], f"Single test: {test_name}"
         )
 
     else:
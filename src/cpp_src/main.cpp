@@ -1,15 +1,52 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/numpy.h>
+#include <pybind11/stl.h>
+#include <array>
+#include <string>
 #include "volgrid.hpp"
 
 namespace py = pybind11;
 
+// Format the shape of an array the way Python prints tuples, e.g. "(1, 3)"
+static std::string shape_str(const py::array& array)
+{
+    return py::str(array.attr("shape")).cast<std::string>();
+}
+
+// Validate array shapes and grid spacing before any work is done (radii may be null for a uniform radius)
+static void validate_inputs(const py::array& coords, const py::array* radii, const double grid_spacing)
+{
+    if (coords.ndim() != 2 || coords.shape(1) != 3) {
+        throw py::value_error("coords must have shape (N, 3), got shape " + shape_str(coords));
+    }
+    if (coords.shape(0) == 0) {
+        throw py::value_error("coords must contain at least one coordinate");
+    }
+    if (!(grid_spacing > 0.0)) {
+        throw py::value_error("grid_spacing must be greater than 0.0");
+    }
+    if (radii == nullptr) {
+        return;
+    }
+    if (radii->ndim() != 1) {
+        throw py::value_error("radii must be 1-dimensional, got shape " + shape_str(*radii));
+    }
+    if (radii->shape(0) != coords.shape(0)) {
+        throw py::value_error(
+            "Number of radii (" + std::to_string(radii->shape(0)) + ") must match number of coordinates ("
+            + std::to_string(coords.shape(0)) + ")"
+        );
+    }
+}
+
 // Float64 backend
 double calc_vol_float64(
     py::array_t<double, py::array::c_style> coords,
     py::array_t<double, py::array::c_style> radii,
-    double grid_spacing
+    double grid_spacing,
+    bool exact_when_disjoint
 ) {
+    validate_inputs(coords, &radii, grid_spacing);
     size_t n_spheres = static_cast<size_t>(coords.shape(0));
     const double* ptr_coords = coords.data();
     const double* ptr_radii = radii.data();
@@ -17,7 +54,7 @@ double calc_vol_float64(
     double volume;
     {
         py::gil_scoped_release release;
-        volume = volume_of_spheres<double>(ptr_coords, ptr_radii, n_spheres, grid_spacing);
+        volume = volume_of_spheres<double>(ptr_coords, ptr_radii, n_spheres, grid_spacing, exact_when_disjoint);
     }
     return volume;
 }
@@ -26,18 +63,126 @@ double calc_vol_float64(
 double calc_vol_float32(
     py::array_t<float, py::array::c_style> coords,
     py::array_t<float, py::array::c_style> radii,
-    float grid_spacing
+    float grid_spacing,
+    bool exact_when_disjoint
 ) {
+    validate_inputs(coords, &radii, grid_spacing);
     size_t n_spheres = static_cast<size_t>(coords.shape(0));
     const float* ptr_coords = coords.data();
     const float* ptr_radii = radii.data();
 
-    float volume;
+    double volume;
+    {
+        py::gil_scoped_release release;
+        volume = volume_of_spheres<float>(ptr_coords, ptr_radii, n_spheres, grid_spacing, exact_when_disjoint);
+    }
+    return volume;
+}
+
+// Float64 backend, uniform radius
+double calc_vol_scalar_radius_float64(
+    py::array_t<double, py::array::c_style> coords,
+    double radius,
+    double grid_spacing,
+    bool exact_when_disjoint
+) {
+    validate_inputs(coords, nullptr, grid_spacing);
+    size_t n_spheres = static_cast<size_t>(coords.shape(0));
+    const double* ptr_coords = coords.data();
+
+    double volume;
+    {
+        py::gil_scoped_release release;
+        volume = volume_of_spheres_uniform<double>(ptr_coords, radius, n_spheres, grid_spacing, exact_when_disjoint);
+    }
+    return volume;
+}
+
+// Float32 backend, uniform radius
+double calc_vol_scalar_radius_float32(
+    py::array_t<float, py::array::c_style> coords,
+    float radius,
+    float grid_spacing,
+    bool exact_when_disjoint
+) {
+    validate_inputs(coords, nullptr, grid_spacing);
+    size_t n_spheres = static_cast<size_t>(coords.shape(0));
+    const float* ptr_coords = coords.data();
+
+    double volume;
+    {
+        py::gil_scoped_release release;
+        volume = volume_of_spheres_uniform<float>(ptr_coords, radius, n_spheres, grid_spacing, exact_when_disjoint);
+    }
+    return volume;
+}
+
+// Check that a caller-provided grid has one bit per grid point, with z rows padded to 64-bit words
+static void validate_grid(const py::array& grid, const std::array<size_t, 3>& shape)
+{
+    const size_t n_words = grid_words(TR<size_t>{shape[0], shape[1], shape[2]});
+    if (grid.ndim() != 1 || static_cast<size_t>(grid.shape(0)) != n_words) {
+        throw py::value_error(
+            "grid must be 1-dimensional with " + std::to_string(n_words) + " words, got shape " + shape_str(grid)
+        );
+    }
+}
+
+// Caller-provided grid backend (float32 and float64)
+template<typename T>
+double calc_vol_inplace(
+    py::array_t<T, py::array::c_style> coords,
+    py::array_t<T, py::array::c_style> radii,
+    py::array_t<uint64_t, py::array::c_style> grid,
+    std::array<T, 3> origin,
+    std::array<size_t, 3> shape,
+    T grid_spacing
+) {
+    validate_inputs(coords, &radii, grid_spacing);
+    validate_grid(grid, shape);
+    size_t n_spheres = static_cast<size_t>(coords.shape(0));
+    const T* ptr_coords = coords.data();
+    const T* ptr_radii = radii.data();
+    uint64_t* ptr_grid = grid.mutable_data();
+    const TR<size_t> extent = {shape[0], shape[1], shape[2]};
+    const TR<T> grid_origin = {origin[0], origin[1], origin[2]};
+
+    double volume;
     {
         py::gil_scoped_release release;
-        volume = volume_of_spheres<float>(ptr_coords, ptr_radii, n_spheres, grid_spacing);
+        volume = volume_of_spheres_inplace<T>(
+            ptr_coords, ptr_radii, n_spheres, grid_spacing, ptr_grid, extent, grid_origin
+        );
     }
-    return static_cast<double>(volume);
+    return volume;
+}
+
+// Caller-provided grid backend, uniform radius (float32 and float64)
+template<typename T>
+double calc_vol_scalar_radius_inplace(
+    py::array_t<T, py::array::c_style> coords,
+    T radius,
+    py::array_t<uint64_t, py::array::c_style> grid,
+    std::array<T, 3> origin,
+    std::array<size_t, 3> shape,
+    T grid_spacing
+) {
+    validate_inputs(coords, nullptr, grid_spacing);
+    validate_grid(grid, shape);
+    size_t n_spheres = static_cast<size_t>(coords.shape(0));
+    const T* ptr_coords = coords.data();
+    uint64_t* ptr_grid = grid.mutable_data();
+    const TR<size_t> extent = {shape[0], shape[1], shape[2]};
+    const TR<T> grid_origin = {origin[0], origin[1], origin[2]};
+
+    double volume;
+    {
+        py::gil_scoped_release release;
+        volume = volume_of_spheres_uniform_inplace<T>(
+            ptr_coords, radius, n_spheres, grid_spacing, ptr_grid, extent, grid_origin
+        );
+    }
+    return volume;
 }
 
 PYBIND11_MODULE(_core, m) {
@@ -51,16 +196,19 @@ PYBIND11_MODULE(_core, m) {
                 coords: N x 3 array of sphere center coordinates (float64, C-contiguous)
                 radii: 1D array of sphere radii (float64, length N, C-contiguous)
                 grid_spacing: Grid spacing for the volume calculation (float64)
+                exact_when_disjoint: Use the analytical volume of spheres that overlap no other sphere
 
             Returns:
                 float: Estimated volume occupied by the spheres
 
             Notes:
-                Arrays must be C-contiguous and float64. GIL is released during computation.
+                Arrays must be C-contiguous and float64. Shapes and grid spacing are validated
+                (raising ValueError) before the GIL is released for the computation.
         )pbdoc",
         py::arg("coords").noconvert(),
         py::arg("radii").noconvert(),
-        py::arg("grid_spacing") = 0.1
+        py::arg("grid_spacing") = 0.1,
+        py::arg("exact_when_disjoint") = false
     );
 
     m.def("_volume_from_spheres_float32", &calc_vol_float32,
@@ -71,15 +219,182 @@ PYBIND11_MODULE(_core, m) {
                 coords: N x 3 array of sphere center coordinates (float32, C-contiguous)
                 radii: 1D array of sphere radii (float32, length N, C-contiguous)
                 grid_spacing: Grid spacing for the volume calculation (float32)
+                exact_when_disjoint: Use the analytical volume of spheres that overlap no other sphere
+
+            Returns:
+                float: Estimated volume occupied by the spheres
+
+            Notes:
+                Arrays must be C-contiguous and float32. Shapes and grid spacing are validated
+                (raising ValueError) before the GIL is released for the computation.
+        )pbdoc",
+        py::arg("coords").noconvert(),
+        py::arg("radii").noconvert(),
+        py::arg("grid_spacing") = 0.1f,
+        py::arg("exact_when_disjoint") = false
+    );
+
+    m.def("_volume_from_spheres_scalar_radius_float64", &calc_vol_scalar_radius_float64,
+        R"pbdoc(
+            Calculate the volume occupied by spheres sharing one radius (float64 backend).
+
+            Args:
+                coords: N x 3 array of sphere center coordinates (float64, C-contiguous)
+                radius: Radius applied to every sphere (float64)
+                grid_spacing: Grid spacing for the volume calculation (float64)
+                exact_when_disjoint: Use the analytical volume of spheres that overlap no other sphere
+
+            Returns:
+                float: Estimated volume occupied by the spheres
+
+            Notes:
+                Array must be C-contiguous and float64. Shape and grid spacing are validated
+                (raising ValueError) before the GIL is released for the computation.
+        )pbdoc",
+        py::arg("coords").noconvert(),
+        py::arg("radius"),
+        py::arg("grid_spacing") = 0.1,
+        py::arg("exact_when_disjoint") = false
+    );
+
+    m.def("_volume_from_spheres_scalar_radius_float32", &calc_vol_scalar_radius_float32,
+        R"pbdoc(
+            Calculate the volume occupied by spheres sharing one radius (float32 backend).
+
+            Args:
+                coords: N x 3 array of sphere center coordinates (float32, C-contiguous)
+                radius: Radius applied to every sphere (float32)
+                grid_spacing: Grid spacing for the volume calculation (float32)
+                exact_when_disjoint: Use the analytical volume of spheres that overlap no other sphere
 
             Returns:
                 float: Estimated volume occupied by the spheres
 
             Notes:
-                Arrays must be C-contiguous and float32. GIL is released during computation.
+                Array must be C-contiguous and float32. Shape and grid spacing are validated
+                (raising ValueError) before the GIL is released for the computation.
+        )pbdoc",
+        py::arg("coords").noconvert(),
+        py::arg("radius"),
+        py::arg("grid_spacing") = 0.1f,
+        py::arg("exact_when_disjoint") = false
+    );
+
+    m.def("_volume_from_spheres_inplace_float64", &calc_vol_inplace<double>,
+        R"pbdoc(
+            Calculate the volume occupied by spheres on a caller-provided grid (float64 backend).
+
+            Args:
+                coords: N x 3 array of sphere center coordinates (float64, C-contiguous)
+                radii: 1D array of sphere radii (float64, length N, C-contiguous)
+                grid: 1D uint64 array with one bit per grid point (z rows padded to 64 bits), overwritten
+                origin: Cartesian coordinates of the first grid point
+                shape: Number of grid points along x, y and z
+                grid_spacing: Grid spacing for the volume calculation (float64)
+
+            Returns:
+                float: Estimated volume occupied by the spheres inside the grid
+
+            Notes:
+                Arrays must be C-contiguous. Parts of spheres outside the grid are ignored.
+                The GIL is released during computation.
+        )pbdoc",
+        py::arg("coords").noconvert(),
+        py::arg("radii").noconvert(),
+        py::arg("grid").noconvert(),
+        py::arg("origin"),
+        py::arg("shape"),
+        py::arg("grid_spacing")
+    );
+
+    m.def("_volume_from_spheres_inplace_float32", &calc_vol_inplace<float>,
+        R"pbdoc(
+            Calculate the volume occupied by spheres on a caller-provided grid (float32 backend).
+
+            Args:
+                coords: N x 3 array of sphere center coordinates (float32, C-contiguous)
+                radii: 1D array of sphere radii (float32, length N, C-contiguous)
+                grid: 1D uint64 array with one bit per grid point (z rows padded to 64 bits), overwritten
+                origin: Cartesian coordinates of the first grid point
+                shape: Number of grid points along x, y and z
+                grid_spacing: Grid spacing for the volume calculation (float32)
+
+            Returns:
+                float: Estimated volume occupied by the spheres inside the grid
+
+            Notes:
+                Arrays must be C-contiguous. Parts of spheres outside the grid are ignored.
+                The GIL is released during computation.
         )pbdoc",
         py::arg("coords").noconvert(),
         py::arg("radii").noconvert(),
-        py::arg("grid_spacing") = 0.1f
+        py::arg("grid").noconvert(),
+        py::arg("origin"),
+        py::arg("shape"),
+        py::arg("grid_spacing")
+    );
+
+    m.def("_volume_from_spheres_scalar_radius_inplace_float64", &calc_vol_scalar_radius_inplace<double>,
+        R"pbdoc(
+            Calculate the volume occupied by spheres sharing one radius on a caller-provided grid (float64 backend).
+
+            Args:
+                coords: N x 3 array of sphere center coordinates (float64, C-contiguous)
+                radius: Radius applied to every sphere (float64)
+                grid: 1D uint64 array with one bit per grid point (z rows padded to 64 bits), overwritten
+                origin: Cartesian coordinates of the first grid point
+                shape: Number of grid points along x, y and z
+                grid_spacing: Grid spacing for the volume calculation (float64)
+
+            Returns:
+                float: Estimated volume occupied by the spheres inside the grid
+
+            Notes:
+                Arrays must be C-contiguous. Parts of spheres outside the grid are ignored.
+                The GIL is released during computation.
+        )pbdoc",
+        py::arg("coords").noconvert(),
+        py::arg("radius"),
+        py::arg("grid").noconvert(),
+        py::arg("origin"),
+        py::arg("shape"),
+        py::arg("grid_spacing")
+    );
+
+    m.def("_volume_from_spheres_scalar_radius_inplace_float32", &calc_vol_scalar_radius_inplace<float>,
+        R"pbdoc(
+            Calculate the volume occupied by spheres sharing one radius on a caller-provided grid (float32 backend).
+
+            Args:
+                coords: N x 3 array of sphere center coordinates (float32, C-contiguous)
+                radius: Radius applied to every sphere (float32)
+                grid: 1D uint64 array with one bit per grid point (z rows padded to 64 bits), overwritten
+                origin: Cartesian coordinates of the first grid point
+                shape: Number of grid points along x, y and z
+                grid_spacing: Grid spacing for the volume calculation (float32)
+
+            Returns:
+                float: Estimated volume occupied by the spheres inside the grid
+
+            Notes:
+                Arrays must be C-contiguous. Parts of spheres outside the grid are ignored.
+                The GIL is released during computation.
+        )pbdoc",
+        py::arg("coords").noconvert(),
+        py::arg("radius"),
+        py::arg("grid").noconvert(),
+        py::arg("origin"),
+        py::arg("shape"),
+        py::arg("grid_spacing")
+    );
+
+    m.def("_clear_pool", &clear_grid_pool,
+        R"pbdoc(
+            Release the grid buffer kept between calls by the calling thread.
+
+            Notes:
+                volume_from_spheres keeps the largest grid it allocated on each thread and
+                reuses it for later calls. The buffer is allocated again when needed.
+        )pbdoc"
     );
 }
@@ -5,84 +5,522 @@
 #include <limits>
 #include <cmath>
 #include <algorithm>
-#include <memory>
+#include <vector>
 
+// Radius accessors that let the grid kernel be specialised for per-sphere and uniform radii
 template<typename T>
-T volume_of_spheres(const T* coords, const T* radii, const size_t n_spheres, const T grid_spacing)
+struct PerSphereRadius {
+    const T* radii;
+    T operator()(const size_t i) const { return radii[i]; }
+};
+
+template<typename T>
+struct UniformRadius {
+    T radius;
+    T operator()(const size_t) const { return radius; }
+};
+
+// Sphere centers and radii in grid units, stored as one contiguous array per component
+template<typename T>
+struct SphereArrays {
+    std::vector<T> x, y, z, radius, radius_squared;
+};
+
+// Convert the interleaved [x1, y1, z1, x2, ...] coordinates and the radii to grid units relative to the origin
+template<typename T, typename Radius>
+static SphereArrays<T> to_grid_units(
+    const T* coords, const Radius& radius_of, const size_t n_spheres, const TR<T>& origin, const T grid_spacing
+)
+{
+    SphereArrays<T> spheres;
+    spheres.x.resize(n_spheres);
+    spheres.y.resize(n_spheres);
+    spheres.z.resize(n_spheres);
+    spheres.radius.resize(n_spheres);
+    spheres.radius_squared.resize(n_spheres);
+
+    for (size_t i = 0; i < n_spheres; ++i) {
+        T radius = radius_of(i) / grid_spacing;
+        spheres.x[i] = (coords[3 * i] - origin.x) / grid_spacing;
+        spheres.y[i] = (coords[3 * i + 1] - origin.y) / grid_spacing;
+        spheres.z[i] = (coords[3 * i + 2] - origin.z) / grid_spacing;
+        spheres.radius[i] = radius;
+        spheres.radius_squared[i] = radius * radius;
+    }
+    return spheres;
+}
+
+// Drop spheres that share their center with a sphere at least as large; they cannot mark additional grid points
+template<typename T>
+static void drop_concentric(SphereArrays<T>& spheres)
+{
+    const size_t n_spheres = spheres.x.size();
+    if (n_spheres < 2) {
+        return;
+    }
+
+    // sort by center, largest radius first among spheres with the same center
+    std::vector<size_t> order(n_spheres);
+    for (size_t i = 0; i < n_spheres; ++i) {
+        order[i] = i;
+    }
+    std::sort(order.begin(), order.end(), [&spheres](size_t a, size_t b) {
+        if (spheres.x[a] != spheres.x[b]) return spheres.x[a] < spheres.x[b];
+        if (spheres.y[a] != spheres.y[b]) return spheres.y[a] < spheres.y[b];
+        if (spheres.z[a] != spheres.z[b]) return spheres.z[a] < spheres.z[b];
+        return spheres.radius[a] > spheres.radius[b];
+    });
+
+    SphereArrays<T> kept;
+    for (size_t k = 0; k < n_spheres; ++k) {
+        const size_t i = order[k];
+        if (k > 0) {
+            const size_t previous = order[k - 1];
+            if (spheres.x[i] == spheres.x[previous] && spheres.y[i] == spheres.y[previous]
+                && spheres.z[i] == spheres.z[previous]) {
+                continue;
+            }
+        }
+        kept.x.push_back(spheres.x[i]);
+        kept.y.push_back(spheres.y[i]);
+        kept.z.push_back(spheres.z[i]);
+        kept.radius.push_back(spheres.radius[i]);
+        kept.radius_squared.push_back(spheres.radius_squared[i]);
+    }
+    spheres = std::move(kept);
+}
+
+// Grid buffer kept between calls on each thread, so repeated calculations skip the allocation
+static thread_local std::vector<uint64_t> grid_pool;
+
+// Return a grid buffer of at least n_words words from the pool, growing it if needed (contents are undefined)
+static uint64_t* pooled_grid(const size_t n_words)
+{
+    if (grid_pool.size() < n_words) {
+        try {
+            // release the old buffer first so that the old and new buffers are never held together
+            std::vector<uint64_t>().swap(grid_pool);
+            grid_pool.resize(n_words);
+        }
+        catch (const std::bad_alloc&) {
+            throw std::runtime_error("Memory allocation failed for the grid.");
+        }
+    }
+    return grid_pool.data();
+}
+
+void clear_grid_pool()
+{
+    std::vector<uint64_t>().swap(grid_pool);
+}
+
+// Number of set bits in a 64-bit word
+static inline size_t popcount64(uint64_t word)
+{
+#if defined(__GNUC__) || defined(__clang__)
+    return static_cast<size_t>(__builtin_popcountll(word));
+#else
+    word = word - ((word >> 1) & 0x5555555555555555ULL);
+    word = (word & 0x3333333333333333ULL) + ((word >> 2) & 0x3333333333333333ULL);
+    word = (word + (word >> 4)) & 0x0F0F0F0F0F0F0F0FULL;
+    return static_cast<size_t>((word * 0x0101010101010101ULL) >> 56);
+#endif
+}
+
+// Carry-save adder over the bits of three words: high gets the carries, low the sums
+static inline void carry_save_add(uint64_t& high, uint64_t& low, const uint64_t a, const uint64_t b, const uint64_t c)
+{
+    const uint64_t u = a ^ b;
+    high = (a & b) | (u & c);
+    low = u ^ c;
+}
+
+// Count the grid points marked in a bit-packed grid.
+// Blocks of 16 words are reduced with the Harley-Seal carry-save adder tree, which needs one
+// popcount per block instead of one per word; the partial counters are weighted at the end.
+static size_t count_marked(const uint64_t* grid, const size_t n_words)
+{
+    uint64_t ones = 0, twos = 0, fours = 0, eights = 0;
+    uint64_t twos_a, twos_b, fours_a, fours_b, eights_a, eights_b, sixteens;
+    size_t sixteens_count = 0;
+    size_t i = 0;
+    for (; i + 16 <= n_words; i += 16) {
+        const uint64_t* w = grid + i;
+        carry_save_add(twos_a, ones, ones, w[0], w[1]);
+        carry_save_add(twos_b, ones, ones, w[2], w[3]);
+        carry_save_add(fours_a, twos, twos, twos_a, twos_b);
+        carry_save_add(twos_a, ones, ones, w[4], w[5]);
+        carry_save_add(twos_b, ones, ones, w[6], w[7]);
+        carry_save_add(fours_b, twos, twos, twos_a, twos_b);
+        carry_save_add(eights_a, fours, fours, fours_a, fours_b);
+        carry_save_add(twos_a, ones, ones, w[8], w[9]);
+        carry_save_add(twos_b, ones, ones, w[10], w[11]);
+        carry_save_add(fours_a, twos, twos, twos_a, twos_b);
+        carry_save_add(twos_a, ones, ones, w[12], w[13]);
+        carry_save_add(twos_b, ones, ones, w[14], w[15]);
+        carry_save_add(fours_b, twos, twos, twos_a, twos_b);
+        carry_save_add(eights_b, fours, fours, fours_a, fours_b);
+        carry_save_add(sixteens, eights, eights, eights_a, eights_b);
+        sixteens_count += popcount64(sixteens);
+    }
+
+    size_t points = 16 * sixteens_count + 8 * popcount64(eights) + 4 * popcount64(fours)
+                    + 2 * popcount64(twos) + popcount64(ones);
+    for (; i < n_words; ++i) {
+        points += popcount64(grid[i]);
+    }
+    return points;
+}
+
+// Bounding boxes [min, max) of the spheres in grid points, clipped to the grid
+template<typename T>
+static std::vector<Box> bounding_boxes(const SphereArrays<T>& spheres, const TR<size_t>& extent)
+{
+    const size_t n_spheres = spheres.x.size();
+    std::vector<Box> boxes(n_spheres);
+    for (size_t i = 0; i < n_spheres; ++i) {
+        const T cx = spheres.x[i];
+        const T cy = spheres.y[i];
+        const T cz = spheres.z[i];
+        const T radius = spheres.radius[i];
+        boxes[i].min.x = static_cast<size_t>(std::clamp(std::floor(cx - radius), T(0.0), static_cast<T>(extent.x)));
+        boxes[i].max.x = static_cast<size_t>(std::clamp(std::ceil(cx + radius), T(0.0), static_cast<T>(extent.x)));
+        boxes[i].min.y = static_cast<size_t>(std::clamp(std::floor(cy - radius), T(0.0), static_cast<T>(extent.y)));
+        boxes[i].max.y = static_cast<size_t>(std::clamp(std::ceil(cy + radius), T(0.0), static_cast<T>(extent.y)));
+        boxes[i].min.z = static_cast<size_t>(std::clamp(std::floor(cz - radius), T(0.0), static_cast<T>(extent.z)));
+        boxes[i].max.z = static_cast<size_t>(std::clamp(std::ceil(cz + radius), T(0.0), static_cast<T>(extent.z)));
+    }
+    return boxes;
+}
+
+// Set the bits [begin, end) of a bit-packed z row, begin < end
+static inline void fill_bits(uint64_t* row, const size_t begin, const size_t end)
+{
+    const size_t first = begin / 64;
+    const size_t last = (end - 1) / 64;
+    const uint64_t first_mask = ~uint64_t(0) << (begin % 64);
+    const uint64_t last_mask = ~uint64_t(0) >> (63 - (end - 1) % 64);
+    if (first == last) {
+        row[first] |= first_mask & last_mask;
+        return;
+    }
+    row[first] |= first_mask;
+    for (size_t word = first + 1; word < last; ++word) {
+        row[word] = ~uint64_t(0);
+    }
+    row[last] |= last_mask;
+}
+
+// Mark the points of one z row of a bit-packed grid that lie inside a sphere, given the squared distance
+// dxy_squared of the row from the center. The squared distance only grows with |z - cz|, also in floating
+// point, so the points inside form a single run of the row: its ends are estimated from the chord of the
+// sphere, corrected with the inclusion test used for every point, and the run is filled without further tests.
+template<typename T>
+static inline void mark_row(
+    uint64_t* row, const size_t z_min, const size_t z_max, const size_t offset_z,
+    const T cz, const T dxy_squared, const T radius_squared
+)
 {
+    // dz * dz can only add to dxy_squared, so a row outside the sphere has no point inside
+    if (dxy_squared > radius_squared || z_min >= z_max) return;
+
+    const auto inside = [&](const size_t z) {
+        const T dz = static_cast<T>(z + offset_z) - cz;
+        return (dxy_squared + dz * dz) <= radius_squared;
+    };
+    const auto clamp_to_row = [&](const T z) -> size_t {
+        const T local = z - static_cast<T>(offset_z);
+        if (!(local > static_cast<T>(z_min))) return z_min;
+        if (local >= static_cast<T>(z_max - 1)) return z_max - 1;
+        return static_cast<size_t>(local);
+    };
+
+    // one of the two points next to the center is inside if any point of the row is
+    size_t anchor = clamp_to_row(std::floor(cz));
+    if (!inside(anchor)) {
+        if (anchor + 1 >= z_max || !inside(anchor + 1)) return;
+        ++anchor;
+    }
+
+    // move the chord ends onto the first and last point inside
+    const T half_chord = std::sqrt(radius_squared - dxy_squared);
+    size_t first = std::min(clamp_to_row(std::ceil(cz - half_chord)), anchor);
+    if (inside(first)) {
+        while (first > z_min && inside(first - 1)) --first;
+    }
+    else {
+        while (!inside(first)) ++first;
+    }
+    size_t last = std::max(clamp_to_row(std::floor(cz + half_chord)), anchor);
+    if (inside(last)) {
+        while (last + 1 < z_max && inside(last + 1)) ++last;
+    }
+    else {
+        while (!inside(last)) --last;
+    }
+
+    fill_bits(row, first, last + 1);
+}
+
+// Side length in grid points of the (x, y) tiles the grid is marked in; z rows are never split
+constexpr size_t TILE_SIZE = 32;
+
+// Smallest grid (in points) whose tiles are marked in parallel when the extension is built with OpenMP
+constexpr size_t PARALLEL_MIN_POINTS = 1000000;
+
+// Mark the grid points inside the given spheres on a bit-packed grid covering `grid_box` of the full grid.
+// The grid is processed in tiles of TILE_SIZE x TILE_SIZE z rows, so all spheres reaching into a tile
+// are marked while its rows are still in cache.
+template<typename T>
+static void mark_spheres(
+    uint64_t* grid, const Box& grid_box, const SphereArrays<T>& spheres,
+    const std::vector<Box>& boxes, const size_t* members, const size_t n_members
+)
+{
+    const TR<size_t>& offset = grid_box.min;
+    const TR<size_t> extent = box_extent(grid_box);
+    const size_t row_words = grid_row_words(extent);
+    const size_t n_tiles_x = (extent.x + TILE_SIZE - 1) / TILE_SIZE;
+    const size_t n_tiles_y = (extent.y + TILE_SIZE - 1) / TILE_SIZE;
+    const std::ptrdiff_t n_tiles = static_cast<std::ptrdiff_t>(n_tiles_x * n_tiles_y);
+
+    // tiles cover disjoint sets of z rows, so they can be marked by different threads without a reduction
+#pragma omp parallel for schedule(dynamic) if (extent.x * extent.y * extent.z >= PARALLEL_MIN_POINTS)
+    for (std::ptrdiff_t tile = 0; tile < n_tiles; ++tile) {
+        const size_t tile_x = grid_box.min.x + static_cast<size_t>(tile) / n_tiles_y * TILE_SIZE;
+        const size_t tile_y = grid_box.min.y + static_cast<size_t>(tile) % n_tiles_y * TILE_SIZE;
+        for (size_t m = 0; m < n_members; ++m) {
+            const size_t i = members[m];
+
+            // part of the bounding box of the sphere inside this tile
+            const size_t x_min = std::max(boxes[i].min.x, tile_x);
+            const size_t x_max = std::min(boxes[i].max.x, tile_x + TILE_SIZE);
+            const size_t y_min = std::max(boxes[i].min.y, tile_y);
+            const size_t y_max = std::min(boxes[i].max.y, tile_y + TILE_SIZE);
+            if (x_min >= x_max || y_min >= y_max) continue;
+
+            const T cx = spheres.x[i];
+            const T cy = spheres.y[i];
+            const T cz = spheres.z[i];
+            const T radius_squared = spheres.radius_squared[i];
+            const size_t z_min = boxes[i].min.z - offset.z;
+            const size_t z_max = boxes[i].max.z - offset.z;
+
+            // iterate over the bounding box and mark points inside the sphere
+            for (size_t x = x_min; x < x_max; ++x) {
+                const T dx = static_cast<T>(x) - cx;
+                for (size_t y = y_min; y < y_max; ++y) {
+                    const T dy = static_cast<T>(y) - cy;
+                    const T dxy_squared = dx * dx + dy * dy;
+
+                    uint64_t* row = grid + ((x - offset.x) * extent.y + (y - offset.y)) * row_words;
+                    mark_row(row, z_min, z_max, offset.z, cz, dxy_squared, radius_squared);
+                }
+            }
+        }
+    }
+}
+
+static size_t find_root(std::vector<size_t>& parent, size_t i)
+{
+    while (parent[i] != i) {
+        parent[i] = parent[parent[i]];
+        i = parent[i];
+    }
+    return i;
+}
+
+// Group spheres whose bounding boxes overlap, directly or through other spheres, into clusters
+static std::vector<std::vector<size_t>> find_clusters(const std::vector<Box>& boxes)
+{
+    // sort the non-empty boxes along x and sweep, comparing each box with the boxes still open at its start
+    std::vector<size_t> order;
+    order.reserve(boxes.size());
+    // (a negative radius gives an inverted box with max < min, whose unsigned extent would wrap around)
+    for (size_t i = 0; i < boxes.size(); ++i) {
+        const Box& box = boxes[i];
+        if (box.max.x > box.min.x && box.max.y > box.min.y && box.max.z > box.min.z) {
+            order.push_back(i);
+        }
+    }
+    std::sort(order.begin(), order.end(), [&boxes](size_t a, size_t b) { return boxes[a].min.x < boxes[b].min.x; });
+
+    std::vector<size_t> parent(boxes.size());
+    for (size_t i = 0; i < parent.size(); ++i) {
+        parent[i] = i;
+    }
+
+    std::vector<size_t> open;
+    for (const size_t i : order) {
+        const Box& box = boxes[i];
+        open.erase(
+            std::remove_if(open.begin(), open.end(), [&](size_t j) { return boxes[j].max.x <= box.min.x; }),
+            open.end()
+        );
+        for (const size_t j : open) {
+            const Box& other = boxes[j];
+            const bool overlap_y = box.min.y < other.max.y && other.min.y < box.max.y;
+            const bool overlap_z = box.min.z < other.max.z && other.min.z < box.max.z;
+            if (overlap_y && overlap_z) {
+                parent[find_root(parent, i)] = find_root(parent, j);
+            }
+        }
+        open.push_back(i);
+    }
+
+    // collect the members of every cluster
+    std::vector<std::vector<size_t>> clusters;
+    std::vector<size_t> cluster_of_root(boxes.size(), boxes.size());
+    for (const size_t i : order) {
+        const size_t root = find_root(parent, i);
+        if (cluster_of_root[root] == boxes.size()) {
+            cluster_of_root[root] = clusters.size();
+            clusters.emplace_back();
+        }
+        clusters[cluster_of_root[root]].push_back(i);
+    }
+    return clusters;
+}
+
+template<typename T, typename Radius>
+static double rasterize_spheres(
+    const T* coords, const Radius& radius_of, const size_t n_spheres, const T max_radius, const T grid_spacing,
+    const bool exact_when_disjoint
+)
+{
+    // no spheres, no volume (and no extent to build a grid from); only reachable from C++ callers,
+    // the Python bindings reject empty coords in validate_inputs
+    if (n_spheres == 0) {
+        return 0.0;
+    }
+
     // calculate origin and extent of the grid
     TR<size_t> extent;
     TR<T> origin;
-    T cushion = grid_spacing + get_max(radii, n_spheres);
+    T cushion = grid_spacing + max_radius;
     get_grid_params(coords, n_spheres, cushion, grid_spacing, extent, origin);
-
-    // allocate memory for the grid and initialize with zeroes
-    size_t n_points = extent.x * extent.y * extent.z;
-    if (n_points == 0) {
+    if (grid_words(extent) == 0) {
         return 0.0;
     }
 
-    std::unique_ptr<int8_t[]> grid;
-    try {
-        grid = std::make_unique<int8_t[]>(n_points);
-        std::fill(grid.get(), grid.get() + n_points, 0);
-    }
-    catch (const std::bad_alloc&) {
-        throw std::runtime_error("Memory allocation failed for the grid.");
+    // spheres with disjoint bounding boxes cannot share grid points, so each cluster of overlapping
+    // spheres is rasterized on a grid covering only its joint bounding box
+    SphereArrays<T> spheres = to_grid_units(coords, radius_of, n_spheres, origin, grid_spacing);
+    drop_concentric(spheres);
+    std::vector<Box> boxes = bounding_boxes(spheres, extent);
+    std::vector<std::vector<size_t>> clusters = find_clusters(boxes);
+
+    std::vector<Box> cluster_boxes(clusters.size());
+    size_t max_words = 0;
+    for (size_t c = 0; c < clusters.size(); ++c) {
+        Box& cluster_box = cluster_boxes[c];
+        cluster_box = boxes[clusters[c].front()];
+        for (const size_t i : clusters[c]) {
+            cluster_box.min.x = std::min(cluster_box.min.x, boxes[i].min.x);
+            cluster_box.min.y = std::min(cluster_box.min.y, boxes[i].min.y);
+            cluster_box.min.z = std::min(cluster_box.min.z, boxes[i].min.z);
+            cluster_box.max.x = std::max(cluster_box.max.x, boxes[i].max.x);
+            cluster_box.max.y = std::max(cluster_box.max.y, boxes[i].max.y);
+            cluster_box.max.z = std::max(cluster_box.max.z, boxes[i].max.z);
+        }
+        if (!(exact_when_disjoint && clusters[c].size() == 1)) {
+            max_words = std::max(max_words, grid_words(box_extent(cluster_box)));
+        }
     }
 
-    // loop over all spheres and mark the grid points inside the spheres
+    // take a grid large enough for the largest cluster from the pool, reused by all clusters
+    uint64_t* grid = pooled_grid(max_words);
+
     size_t points_in_spheres = 0;
-    for (size_t i = 0; i < n_spheres; ++i) {
-        // radius in grid units
-        T radius = radii[i] / grid_spacing;
-        T radius_squared = radius * radius;
-
-        // center of the sphere in grid units
-        // assuming coords is a flat array [x1, y1, z1, x2, y2, z2, ...]
-        size_t c_index = 3 * i;
-        T cx = (coords[c_index] - origin.x) / grid_spacing;
-        T cy = (coords[c_index + 1] - origin.y) / grid_spacing;
-        T cz = (coords[c_index + 2] - origin.z) / grid_spacing;
-
-        // determine the bounding box of the sphere in grid coordinates
-        size_t x_min = static_cast<size_t>(std::max(T(0.0), std::floor(cx - radius)));
-        size_t x_max = static_cast<size_t>(std::min(static_cast<T>(extent.x), std::ceil(cx + radius)));
-        size_t y_min = static_cast<size_t>(std::max(T(0.0), std::floor(cy - radius)));
-        size_t y_max = static_cast<size_t>(std::min(static_cast<T>(extent.y), std::ceil(cy + radius)));
-        size_t z_min = static_cast<size_t>(std::max(T(0.0), std::floor(cz - radius)));
-        size_t z_max = static_cast<size_t>(std::min(static_cast<T>(extent.z), std::ceil(cz + radius)));
-
-        // iterate over the bounding box and mark points inside the sphere
-        for (size_t x = x_min; x < x_max; ++x) {
-            for (size_t y = y_min; y < y_max; ++y) {
-                for (size_t z = z_min; z < z_max; ++z) {
-                    // calculate the 1D index for the 3D grid point (x, y, z)
-                    size_t index = x * extent.y * extent.z + y * extent.z + z;
-
-                    // skip already processed points
-                    if (grid[index] == 1) continue;
-
-                    // check if the point is inside the sphere
-                    T dx = (static_cast<T>(x) - cx);
-                    T dy = (static_cast<T>(y) - cy);
-                    T dz = (static_cast<T>(z) - cz);
-                    if ((dx * dx + dy * dy + dz * dz) <= radius_squared) {
-                        grid[index] = 1;
-                        points_in_spheres++;
-                    }
-                }
-            }
+    double singleton_cubed_radii = 0.0;
+    for (size_t c = 0; c < clusters.size(); ++c) {
+        // a sphere overlapping no other sphere contributes its analytical volume if requested
+        if (exact_when_disjoint && clusters[c].size() == 1) {
+            const double radius = std::max(static_cast<double>(spheres.radius[clusters[c].front()]), 0.0);
+            singleton_cubed_radii += radius * radius * radius;
+            continue;
         }
+        const size_t n_words = grid_words(box_extent(cluster_boxes[c]));
+        std::fill(grid, grid + n_words, 0);
+        mark_spheres(grid, cluster_boxes[c], spheres, boxes, clusters[c].data(), clusters[c].size());
+        points_in_spheres += count_marked(grid, n_words);
     }
 
-    // calculate the total volume
-    T volume_per_point = grid_spacing * grid_spacing * grid_spacing;
-    T total_volume = static_cast<T>(points_in_spheres) * volume_per_point;
+    // calculate the total volume in double precision (the analytical part is in grid units as well)
+    double volume_per_point = static_cast<double>(grid_spacing) * grid_spacing * grid_spacing;
+    double total_volume = static_cast<double>(points_in_spheres) * volume_per_point;
+    if (singleton_cubed_radii > 0.0) {
+        const double sphere_factor = 4.0 / 3.0 * 3.14159265358979323846;
+        total_volume += sphere_factor * singleton_cubed_radii * volume_per_point;
+    }
 
     return total_volume;
 }
 
+template<typename T>
+double volume_of_spheres(
+    const T* coords, const T* radii, const size_t n_spheres, const T grid_spacing, const bool exact_when_disjoint
+)
+{
+    if (n_spheres == 0) {
+        return 0.0;
+    }
+    return rasterize_spheres(coords, PerSphereRadius<T>{radii}, n_spheres, get_max(radii, n_spheres), grid_spacing,
+                             exact_when_disjoint);
+}
+
+template<typename T>
+double volume_of_spheres_uniform(
+    const T* coords, const T radius, const size_t n_spheres, const T grid_spacing, const bool exact_when_disjoint
+)
+{
+    return rasterize_spheres(coords, UniformRadius<T>{radius}, n_spheres, radius, grid_spacing, exact_when_disjoint);
+}
+
+// Reset a caller-provided grid, mark the spheres on it and return their volume
+template<typename T, typename Radius>
+static double rasterize_spheres_inplace(
+    uint64_t* grid, const TR<size_t>& extent, const TR<T>& origin,
+    const T* coords, const Radius& radius_of, const size_t n_spheres, const T grid_spacing
+)
+{
+    // reset the grid from a previous calculation
+    const size_t n_words = grid_words(extent);
+    std::fill(grid, grid + n_words, 0);
+
+    SphereArrays<T> spheres = to_grid_units(coords, radius_of, n_spheres, origin, grid_spacing);
+    drop_concentric(spheres);
+    std::vector<Box> boxes = bounding_boxes(spheres, extent);
+    std::vector<size_t> members(boxes.size());
+    for (size_t i = 0; i < members.size(); ++i) {
+        members[i] = i;
+    }
+    mark_spheres(grid, Box{{0, 0, 0}, extent}, spheres, boxes, members.data(), members.size());
+    size_t points_in_spheres = count_marked(grid, n_words);
+
+    // calculate the total volume
+    double volume_per_point = static_cast<double>(grid_spacing) * grid_spacing * grid_spacing;
+    return static_cast<double>(points_in_spheres) * volume_per_point;
+}
+
+template<typename T>
+double volume_of_spheres_inplace(
+    const T* coords, const T* radii, const size_t n_spheres, const T grid_spacing,
+    uint64_t* grid, const TR<size_t>& extent, const TR<T>& origin
+)
+{
+    return rasterize_spheres_inplace(grid, extent, origin, coords, PerSphereRadius<T>{radii}, n_spheres, grid_spacing);
+}
+
+template<typename T>
+double volume_of_spheres_uniform_inplace(
+    const T* coords, const T radius, const size_t n_spheres, const T grid_spacing,
+    uint64_t* grid, const TR<size_t>& extent, const TR<T>& origin
+)
+{
+    return rasterize_spheres_inplace(grid, extent, origin, coords, UniformRadius<T>{radius}, n_spheres, grid_spacing);
+}
+
 template<typename T>
 T get_max(const T* array, const size_t n)
 {
@@ -169,5 +607,19 @@ template void get_grid_params<float>(const float*, const size_t&,
 template void get_grid_params<double>(const double*, const size_t&,
                                        const double&, const double&, TR<size_t>&, TR<double>&);
 
-template float volume_of_spheres<float>(const float*, const float*, const size_t, const float);
-template double volume_of_spheres<double>(const double*, const double*, const size_t, const double);
+template double volume_of_spheres<float>(const float*, const float*, const size_t, const float, const bool);
+template double volume_of_spheres<double>(const double*, const double*, const size_t, const double, const bool);
+
+template double volume_of_spheres_uniform<float>(const float*, const float, const size_t, const float, const bool);
+template double volume_of_spheres_uniform<double>(const double*, const double, const size_t, const double,
+                                                  const bool);
+
+template double volume_of_spheres_inplace<float>(const float*, const float*, const size_t, const float,
+                                                uint64_t*, const TR<size_t>&, const TR<float>&);
+template double volume_of_spheres_inplace<double>(const double*, const double*, const size_t, const double,
+                                                  uint64_t*, const TR<size_t>&, const TR<double>&);
+
+template double volume_of_spheres_uniform_inplace<float>(const float*, const float, const size_t, const float,
+                                                        uint64_t*, const TR<size_t>&, const TR<float>&);
+template double volume_of_spheres_uniform_inplace<double>(const double*, const double, const size_t, const double,
+                                                          uint64_t*, const TR<size_t>&, const TR<double>&);
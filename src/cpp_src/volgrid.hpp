@@ -2,6 +2,7 @@
 #define VOLGRID_HPP
 
 #include <cstddef>
+#include <cstdint>
 
 // Define a templated struct to hold 3D coordinates of any numeric type
 template<typename T>
@@ -9,10 +10,61 @@ struct TR {
     T x, y, z;
 };
 
+// Box of grid points from min (inclusive) to max (exclusive)
+struct Box {
+    TR<size_t> min, max;
+};
+
+// Number of grid points along each axis of a box
+inline TR<size_t> box_extent(const Box& box)
+{
+    return {box.max.x - box.min.x, box.max.y - box.min.y, box.max.z - box.min.z};
+}
+
+// Number of 64-bit words in one z row of a bit-packed grid (rows are padded to whole words)
+inline size_t grid_row_words(const TR<size_t>& extent)
+{
+    return (extent.z + 63) / 64;
+}
+
+// Number of 64-bit words in a bit-packed grid with the given extent
+inline size_t grid_words(const TR<size_t>& extent)
+{
+    return extent.x * extent.y * grid_row_words(extent);
+}
+
 // Templated function declarations
-// Calculate the volume occupied by spheres using a grid-based approach
+// Calculate the volume occupied by spheres using a grid-based approach.
+// Returns 0 for no spheres; this only guards direct C++ callers, as the Python bindings reject empty coords.
+// All variants sum up the volume in double precision, also for float input.
+// With exact_when_disjoint, spheres overlapping no other sphere contribute their analytical volume.
+template<typename T>
+double volume_of_spheres(
+    const T* coords, const T* radii, const size_t n_spheres, const T grid_spacing, const bool exact_when_disjoint
+);
+
+// Calculate the volume occupied by spheres that all share the same radius
 template<typename T>
-T volume_of_spheres(const T* coords, const T* radii, const size_t n_spheres, const T grid_spacing);
+double volume_of_spheres_uniform(
+    const T* coords, const T radius, const size_t n_spheres, const T grid_spacing, const bool exact_when_disjoint
+);
+
+// Calculate the volume occupied by spheres on a caller-provided grid that is reset before use
+template<typename T>
+double volume_of_spheres_inplace(
+    const T* coords, const T* radii, const size_t n_spheres, const T grid_spacing,
+    uint64_t* grid, const TR<size_t>& extent, const TR<T>& origin
+);
+
+// Calculate the volume occupied by spheres sharing one radius on a caller-provided grid
+template<typename T>
+double volume_of_spheres_uniform_inplace(
+    const T* coords, const T radius, const size_t n_spheres, const T grid_spacing,
+    uint64_t* grid, const TR<size_t>& extent, const TR<T>& origin
+);
+
+// Release the grid buffer kept between calls by the calling thread
+void clear_grid_pool();
 
 // Get the maximum value from an array
 template<typename T>
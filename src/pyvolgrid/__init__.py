@@ -1,21 +1,67 @@
-from importlib.metadata import PackageNotFoundError, version
+import functools
+import os
 from typing import cast
 
 import numpy as np
-from numpy.typing import ArrayLike, NDArray
+from numpy.typing import ArrayLike, DTypeLike, NDArray
 
-from pyvolgrid._core import _volume_from_spheres_float32, _volume_from_spheres_float64
+from pyvolgrid._core import (
+    _clear_pool,
+    _volume_from_spheres_float32,
+    _volume_from_spheres_float64,
+    _volume_from_spheres_inplace_float32,
+    _volume_from_spheres_inplace_float64,
+    _volume_from_spheres_scalar_radius_float32,
+    _volume_from_spheres_scalar_radius_float64,
+    _volume_from_spheres_scalar_radius_inplace_float32,
+    _volume_from_spheres_scalar_radius_inplace_float64,
+)
 
-try:
-    __version__ = version(__name__)
-except PackageNotFoundError:
-    __version__ = "0.0.0"
+# Backend used by volume_from_spheres: the compiled C++ extension, the optional Numba kernel,
+# or the optional Numba CUDA kernel for large grids (smaller grids still use the C++ extension)
+_BACKEND = os.environ.get("PYVOLGRID_BACKEND", "cpp").lower()
+if _BACKEND not in ("cpp", "numba", "cuda"):
+    raise ValueError(f"PYVOLGRID_BACKEND must be 'cpp', 'numba' or 'cuda', got {_BACKEND!r}")
+
+
+def __getattr__(name: str) -> str:
+    # Resolve __version__ lazily so that importing the package skips the metadata lookup
+    if name == "__version__":
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            __version__ = version(__name__)
+        except PackageNotFoundError:
+            __version__ = "0.0.0"
+        globals()["__version__"] = __version__
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.lru_cache(maxsize=32)
+def _pick_dtype(result_type: DTypeLike) -> type[np.floating]:
+    """Return the backend dtype for the promoted dtype of coords and radii.
+
+    The result depends only on the dtype, so the casting check is cached
+    to keep it off the hot path of repeated calls.
+    """
+    # Use float32 if the result can be safely cast, otherwise default to float64
+    return np.float32 if np.can_cast(result_type, np.float32, casting="safe") else np.float64
+
+
+def _prepare(a: np.ndarray, dtype: type[np.floating]) -> np.ndarray:
+    """Return `a` as a C-contiguous array of `dtype`, avoiding a copy where possible."""
+    if a.dtype == dtype and a.flags.c_contiguous:
+        return a
+    return np.ascontiguousarray(a, dtype=dtype)
 
 
 def volume_from_spheres(
     coords: ArrayLike,
     radii: ArrayLike | float,
     grid_spacing: float = 0.1,
+    exact_when_disjoint: bool = False,
+    exact: bool = True,
 ) -> float:
     """Calculate the volume occupied by a set of spheres using a grid-based method.
 
@@ -25,70 +71,208 @@ def volume_from_spheres(
         An array-like object of shape (N, 3) containing the coordinates of the centers.
     radii : array-like or float
         An array-like object of shape (N,) containing the radii of the spheres.
-        If a single float is provided, all spheres are assumed to have the same radius.
+        If a single number (Python or NumPy scalar, or a 0-d array) is provided,
+        all spheres are assumed to have the same radius.
     grid_spacing : float, optional
         The spacing between grid points. Default is 0.1.
+    exact_when_disjoint : bool, optional
+        If True, spheres that overlap no other sphere contribute their analytical
+        volume 4/3 π r³ instead of their grid estimate; only groups of overlapping
+        spheres are rasterized. Always computed by the C++ backend. Default is False.
+    exact : bool, optional
+        If False, the inclusion tests are done in single precision, after moving the
+        centers close to the origin by a whole number of grid spacings. This is faster
+        and uses less memory for the sphere data, but points lying within rounding error
+        of a sphere surface may be classified differently. Default is True.
 
     Returns
     -------
     float
         The total volume occupied by the spheres.
 
+    Raises
+    ------
+    ValueError
+        If the shapes of `coords` and `radii` do not match or `grid_spacing` is not positive.
+
     Notes
     -----
     Input arrays are automatically converted to C-contiguous numpy arrays as required
     by the underlying C++ implementation. Float32 and float64 dtypes are preserved
     to avoid unnecessary conversions; all other types are converted to float64.
-    """
 
-    # Convert to numpy arrays for inspection
-    coords_arr = np.asarray(coords)
-    radii_is_scalar = np.isscalar(radii)
+    Setting the environment variable ``PYVOLGRID_BACKEND=numba`` before importing
+    pyvolgrid selects a parallel Numba kernel instead (requires the ``numba`` extra).
+    ``PYVOLGRID_BACKEND=cuda`` runs grids of at least 10 million points on a CUDA
+    GPU when one is available, and everything else on the C++ backend.
+    """
 
-    # Shape validation for coords
-    if coords_arr.ndim != 2 or coords_arr.shape[1] != 3:
-        raise ValueError(f"coords must have shape (N, 3), got shape {coords_arr.shape}")
-    if coords_arr.shape[0] == 0:
-        raise ValueError("coords must contain at least one coordinate")
+    # Convert to numpy arrays for inspection; ndarrays are used as they are
+    coords_arr = coords if isinstance(coords, np.ndarray) else np.asarray(coords)
 
-    # Determine target dtype using numpy.result_type for robustness
-    if radii_is_scalar:
-        result_type = np.result_type(coords_arr.dtype, radii)
-        radii_arr = None
+    # Determine the target dtype from the promoted input types. A scalar radius takes part as
+    # a value, since the promotion may depend on it (value-based casting before NumPy 2).
+    # A scalar radius is a Python or NumPy number or anything that converts to a 0-d array.
+    radii_arr: np.ndarray | None
+    if isinstance(radii, (int, float, np.number)):
+        radius, radii_arr = radii, None
+        DTYPE = _pick_dtype(np.result_type(coords_arr.dtype, radii))
     else:
-        radii_arr = np.asarray(radii)
-        result_type = np.result_type(coords_arr.dtype, radii_arr.dtype)
+        radii_arr = radii if isinstance(radii, np.ndarray) else np.asarray(radii)
+        DTYPE = _pick_dtype(np.result_type(coords_arr.dtype, radii_arr.dtype))
+        if radii_arr.ndim == 0:
+            radius, radii_arr = radii_arr.item(), None
 
-    # Use float32 if the result can be safely cast, otherwise default to float64
-    DTYPE = np.float32 if np.can_cast(result_type, np.float32, casting="safe") else np.float64
+    # Without exact, compute in float32. The centers are first moved next to the origin by whole grid
+    # spacings, which keeps the grid points at the same positions relative to the spheres.
+    if not exact:
+        if coords_arr.ndim == 2 and coords_arr.shape[0] > 0 and grid_spacing > 0.0:
+            shift = np.floor(coords_arr.min(axis=0) / grid_spacing) * grid_spacing
+            coords_arr = (coords_arr - shift).astype(np.float32)
+        DTYPE = np.float32
 
-    # Validate grid spacing
-    if grid_spacing <= 0.0:
-        raise ValueError("grid_spacing must be greater than 0.0")
+    # Already C-contiguous arrays of the target dtype are passed through without a copy.
+    # Shapes and grid spacing are validated by the backend in the same call that does the work.
+    coords_array = _prepare(coords_arr, DTYPE)
 
-    coords_array = np.ascontiguousarray(coords_arr, dtype=DTYPE)
+    # The Numba and CUDA kernels have no analytical shortcut, so exact_when_disjoint always uses the C++ backend
+    if _BACKEND == "numba" and not exact_when_disjoint:
+        from pyvolgrid._numba_backend import volume_from_spheres as _numba_volume_from_spheres
 
-    if radii_is_scalar:
-        radii_array = np.full(coords_array.shape[0], radii, dtype=DTYPE)
-    else:
-        radii_array = np.ascontiguousarray(radii_arr, dtype=DTYPE)
+        return _numba_volume_from_spheres(coords_array, float(radius) if radii_arr is None else radii_arr, grid_spacing)
+
+    if _BACKEND == "cuda" and not exact_when_disjoint:
+        from pyvolgrid import _cuda_backend
+
+        sphere_radii = float(radius) if radii_arr is None else radii_arr
+        if _cuda_backend.is_worthwhile(coords_array, sphere_radii, grid_spacing):
+            return _cuda_backend.volume_from_spheres(coords_array, sphere_radii, grid_spacing)
 
-    # Validate radii
-    if radii_array.ndim != 1:
-        raise ValueError(f"radii must be 1-dimensional, got shape {radii_array.shape}")
-    if radii_array.shape[0] != coords_array.shape[0]:
-        raise ValueError(
-            f"Number of radii ({radii_array.shape[0]}) must match number of coordinates ({coords_array.shape[0]})"
-        )
+    # A scalar radius is handed to the backend as is instead of being expanded to N radii
+    if radii_arr is None:
+        if DTYPE == np.float32:
+            coords_f32 = cast(NDArray[np.float32], coords_array)
+            return _volume_from_spheres_scalar_radius_float32(coords_f32, radius, grid_spacing, exact_when_disjoint)
+        else:
+            coords_f64 = cast(NDArray[np.float64], coords_array)
+            return _volume_from_spheres_scalar_radius_float64(coords_f64, radius, grid_spacing, exact_when_disjoint)
+
+    radii_array = _prepare(radii_arr, DTYPE)
 
     if DTYPE == np.float32:
         coords_f32 = cast(NDArray[np.float32], coords_array)
         radii_f32 = cast(NDArray[np.float32], radii_array)
-        return _volume_from_spheres_float32(coords_f32, radii_f32, grid_spacing)
+        return _volume_from_spheres_float32(coords_f32, radii_f32, grid_spacing, exact_when_disjoint)
     else:
         coords_f64 = cast(NDArray[np.float64], coords_array)
         radii_f64 = cast(NDArray[np.float64], radii_array)
-        return _volume_from_spheres_float64(coords_f64, radii_f64, grid_spacing)
+        return _volume_from_spheres_float64(coords_f64, radii_f64, grid_spacing, exact_when_disjoint)
+
+
+def clear_pool() -> None:
+    """Release the grid buffer that `volume_from_spheres` keeps between calls.
+
+    The largest grid allocated so far is kept per thread and reused by later calls,
+    which avoids reallocating it for every calculation. Call this function to return
+    the memory after a calculation on a very fine grid. Only the buffer of the calling
+    thread is released.
+    """
+    _clear_pool()
+
+
+class VolumeGridSession:
+    """A reusable grid for repeated volume calculations within a fixed bounding box.
+
+    `volume_from_spheres` sizes a grid to the spheres on every call. When
+    the volume of many similar sphere sets is needed (e.g. the frames of a trajectory),
+    a session allocates the grid once and only resets it between calculations.
+
+    Parameters
+    ----------
+    bbox : array-like
+        An array-like object of shape (2, 3) with the lower and upper corner of the
+        region covered by the grid.
+    grid_spacing : float, optional
+        The spacing between grid points. Default is 0.1.
+    dtype : {np.float32, np.float64}, optional
+        The floating point type used for the calculation. Default is np.float64.
+
+    Notes
+    -----
+    Only the parts of the spheres inside the bounding box contribute to the volume.
+    The grid points coincide with those used by `volume_from_spheres`. A session is
+    not thread-safe, since all calculations share the same grid.
+    """
+
+    def __init__(self, bbox: ArrayLike, grid_spacing: float = 0.1, dtype: DTypeLike = np.float64) -> None:
+        bounds = np.asarray(bbox, dtype=np.float64)
+        if bounds.shape != (2, 3):
+            raise ValueError(f"bbox must have shape (2, 3), got shape {bounds.shape}")
+        if np.any(bounds[1] < bounds[0]):
+            raise ValueError("bbox upper corner must not be below the lower corner")
+        if not grid_spacing > 0.0:
+            raise ValueError("grid_spacing must be greater than 0.0")
+        if np.dtype(dtype) not in (np.float32, np.float64):
+            raise ValueError(f"dtype must be float32 or float64, got {np.dtype(dtype)}")
+
+        lower = np.floor(bounds[0] / grid_spacing)
+        upper = np.ceil(bounds[1] / grid_spacing)
+
+        self.dtype: type[np.floating] = np.float32 if np.dtype(dtype) == np.float32 else np.float64
+        self.grid_spacing = grid_spacing
+        self.origin = (float(lower[0] * grid_spacing), float(lower[1] * grid_spacing), float(lower[2] * grid_spacing))
+        self.shape = (int(upper[0] - lower[0]) + 1, int(upper[1] - lower[1]) + 1, int(upper[2] - lower[2]) + 1)
+        # one bit per grid point, with every z row padded to whole 64-bit words
+        n_words = self.shape[0] * self.shape[1] * -(-self.shape[2] // 64)
+        self._grid: NDArray[np.uint64] = np.zeros(n_words, dtype=np.uint64)
+
+    def volume(self, coords: ArrayLike, radii: ArrayLike | float) -> float:
+        """Calculate the volume occupied by a set of spheres inside the bounding box.
+
+        Parameters
+        ----------
+        coords : array-like
+            An array-like object of shape (N, 3) containing the coordinates of the centers.
+        radii : array-like or float
+            An array-like object of shape (N,) containing the radii of the spheres,
+            or a single number applied to all spheres.
+
+        Returns
+        -------
+        float
+            The volume occupied by the spheres inside the bounding box.
+        """
+        coords_array = _prepare(coords if isinstance(coords, np.ndarray) else np.asarray(coords), self.dtype)
+        radii_arr = radii if isinstance(radii, np.ndarray) else np.asarray(radii)
+
+        # A scalar radius is handed to the backend as is instead of being expanded to N radii
+        if radii_arr.ndim == 0:
+            radius = radii_arr.item()
+            if self.dtype == np.float32:
+                coords_f32 = cast(NDArray[np.float32], coords_array)
+                return _volume_from_spheres_scalar_radius_inplace_float32(
+                    coords_f32, radius, self._grid, self.origin, self.shape, self.grid_spacing
+                )
+            else:
+                coords_f64 = cast(NDArray[np.float64], coords_array)
+                return _volume_from_spheres_scalar_radius_inplace_float64(
+                    coords_f64, radius, self._grid, self.origin, self.shape, self.grid_spacing
+                )
+
+        radii_array = _prepare(radii_arr, self.dtype)
+
+        if self.dtype == np.float32:
+            coords_f32 = cast(NDArray[np.float32], coords_array)
+            radii_f32 = cast(NDArray[np.float32], radii_array)
+            return _volume_from_spheres_inplace_float32(
+                coords_f32, radii_f32, self._grid, self.origin, self.shape, self.grid_spacing
+            )
+        else:
+            coords_f64 = cast(NDArray[np.float64], coords_array)
+            radii_f64 = cast(NDArray[np.float64], radii_array)
+            return _volume_from_spheres_inplace_float64(
+                coords_f64, radii_f64, self._grid, self.origin, self.shape, self.grid_spacing
+            )
 
 
-__all__ = ["volume_from_spheres"]
+__all__ = ["VolumeGridSession", "clear_pool", "volume_from_spheres"]
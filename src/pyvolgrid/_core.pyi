@@ -7,9 +7,56 @@ def _volume_from_spheres_float32(
     coords: NDArray[np.float32],
     radii: NDArray[np.float32],
     grid_spacing: SupportsFloat = ...,
+    exact_when_disjoint: bool = ...,
 ) -> float: ...
 def _volume_from_spheres_float64(
     coords: NDArray[np.float64],
     radii: NDArray[np.float64],
     grid_spacing: SupportsFloat = ...,
+    exact_when_disjoint: bool = ...,
 ) -> float: ...
+def _volume_from_spheres_scalar_radius_float32(
+    coords: NDArray[np.float32],
+    radius: SupportsFloat,
+    grid_spacing: SupportsFloat = ...,
+    exact_when_disjoint: bool = ...,
+) -> float: ...
+def _volume_from_spheres_scalar_radius_float64(
+    coords: NDArray[np.float64],
+    radius: SupportsFloat,
+    grid_spacing: SupportsFloat = ...,
+    exact_when_disjoint: bool = ...,
+) -> float: ...
+def _volume_from_spheres_inplace_float32(
+    coords: NDArray[np.float32],
+    radii: NDArray[np.float32],
+    grid: NDArray[np.uint64],
+    origin: tuple[float, float, float],
+    shape: tuple[int, int, int],
+    grid_spacing: SupportsFloat,
+) -> float: ...
+def _volume_from_spheres_inplace_float64(
+    coords: NDArray[np.float64],
+    radii: NDArray[np.float64],
+    grid: NDArray[np.uint64],
+    origin: tuple[float, float, float],
+    shape: tuple[int, int, int],
+    grid_spacing: SupportsFloat,
+) -> float: ...
+def _volume_from_spheres_scalar_radius_inplace_float32(
+    coords: NDArray[np.float32],
+    radius: SupportsFloat,
+    grid: NDArray[np.uint64],
+    origin: tuple[float, float, float],
+    shape: tuple[int, int, int],
+    grid_spacing: SupportsFloat,
+) -> float: ...
+def _volume_from_spheres_scalar_radius_inplace_float64(
+    coords: NDArray[np.float64],
+    radius: SupportsFloat,
+    grid: NDArray[np.uint64],
+    origin: tuple[float, float, float],
+    shape: tuple[int, int, int],
+    grid_spacing: SupportsFloat,
+) -> float: ...
+def _clear_pool() -> None: ...
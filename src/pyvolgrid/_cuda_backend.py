@@ -0,0 +1,91 @@
+"""Numba CUDA implementation of the grid-based volume calculation.
+
+Selected with the environment variable ``PYVOLGRID_BACKEND=cuda``. Every GPU thread
+evaluates one 64-point word of a z row against all spheres and adds the number of points
+inside to a global counter, so the grid itself is never stored. Grids below
+`MIN_GRID_POINTS` and machines without a CUDA device are left to the C++ backend,
+because the transfer and launch overhead would dominate.
+"""
+
+import math
+
+import numpy as np
+from numba import cuda
+
+from pyvolgrid._numba_backend import _as_radii, _grid_setup, _validate
+
+# Smallest number of grid points for which the GPU is used
+MIN_GRID_POINTS = 10_000_000
+
+# Threads per block along x, y and the z words of the grid
+THREADS_PER_BLOCK = (4, 4, 8)
+
+
+@cuda.jit
+def _count_points_kernel(centers, radii_squared, boxes, grid_points, extent, counter):  # pragma: no cover
+    x, y, word = cuda.grid(3)
+    if x >= extent[0] or y >= extent[1] or word * 64 >= extent[2]:
+        return
+
+    z_first = word * 64
+    z_last = min(z_first + 64, extent[2])
+    mask = np.uint64(0)
+    for i in range(centers.shape[0]):
+        if x < boxes[i, 0, 0] or x >= boxes[i, 0, 1] or y < boxes[i, 1, 0] or y >= boxes[i, 1, 1]:
+            continue
+        dx = grid_points[x] - centers[i, 0]
+        dy = grid_points[y] - centers[i, 1]
+        dxy_squared = dx * dx + dy * dy
+        for z in range(max(z_first, boxes[i, 2, 0]), min(z_last, boxes[i, 2, 1])):
+            dz = grid_points[z] - centers[i, 2]
+            if dxy_squared + dz * dz <= radii_squared[i]:
+                mask |= np.uint64(1) << np.uint64(z - z_first)
+    cuda.atomic.add(counter, 0, np.uint64(cuda.popc(mask)))
+
+
+def is_worthwhile(coords: np.ndarray, radii: np.ndarray | float, grid_spacing: float) -> bool:
+    """Return whether a CUDA device is available and the grid for the spheres is large enough.
+
+    Invalid input returns False, so that it is reported by the C++ backend.
+    """
+    if coords.ndim != 2 or coords.shape[0] == 0 or coords.shape[1] != 3 or not grid_spacing > 0.0:
+        return False
+    max_radius = float(np.max(radii)) if np.size(radii) > 0 else 0.0
+    span = np.ptp(coords, axis=0) + 2.0 * (grid_spacing + max_radius)
+    n_points = math.prod(int(s / grid_spacing) + 2 for s in span)
+    return n_points >= MIN_GRID_POINTS and cuda.is_available()
+
+
+def volume_from_spheres(coords: np.ndarray, radii: np.ndarray | float, grid_spacing: float) -> float:
+    """Calculate the volume occupied by spheres on the GPU.
+
+    `coords` must be a C-contiguous float32 or float64 array; the calculation is done
+    in its dtype. A scalar radius is applied to every sphere.
+    """
+    radii = _as_radii(coords, radii)
+    _validate(coords, radii, grid_spacing)
+
+    h = coords.dtype.type(grid_spacing)
+    extent, centers, radii_squared, boxes, grid_points = _grid_setup(coords, np.ascontiguousarray(radii), h)
+
+    # launch configuration: one thread per 64-point word of every z row
+    n_words = (int(extent[2]) + 63) // 64
+    blocks = (
+        math.ceil(int(extent[0]) / THREADS_PER_BLOCK[0]),
+        math.ceil(int(extent[1]) / THREADS_PER_BLOCK[1]),
+        math.ceil(n_words / THREADS_PER_BLOCK[2]),
+    )
+    counter = cuda.to_device(np.zeros(1, dtype=np.uint64))
+    _count_points_kernel[blocks, THREADS_PER_BLOCK](
+        cuda.to_device(centers),
+        cuda.to_device(radii_squared),
+        cuda.to_device(boxes),
+        cuda.to_device(grid_points),
+        cuda.to_device(extent),
+        counter,
+    )
+    count = int(counter.copy_to_host()[0])
+
+    # the volume is summed up in double precision, as in the C++ backend
+    h_double = float(h)
+    return float(count) * (h_double * h_double * h_double)
@@ -1,14 +1,32 @@
-"""Common test fixtures and utilities for PyVolGrid tests."""
+"""Common test fixtures and utilities for PyVolGrid tests.
 
-import math
+Heavy imports happen inside the fixtures so that loading this module during
+collection stays cheap.
+"""
 
-import numpy as np
 import pytest
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _warmup():
+    """Call volume_from_spheres once per dtype on a tiny grid before the first test.
+
+    One-time costs of the selected backend (loading the extension, compiling the
+    Numba kernels) then do not land on whichever test happens to run first.
+    """
+    import numpy as np
+
+    from pyvolgrid import volume_from_spheres
+
+    for dtype in (np.float32, np.float64):
+        volume_from_spheres(np.zeros((1, 3), dtype=dtype), np.array([0.1], dtype=dtype), grid_spacing=0.5)
+
+
 @pytest.fixture
 def single_sphere():
     """Fixture for a single sphere at origin with radius 1."""
+    import numpy as np
+
     coords = np.array([[0.0, 0.0, 0.0]], dtype=np.float64)
     radii = np.array([1.0], dtype=np.float64)
     return coords, radii
@@ -17,6 +35,8 @@ def single_sphere():
 @pytest.fixture
 def two_non_overlapping_spheres():
     """Fixture for two non-overlapping spheres."""
+    import numpy as np
+
     coords = np.array([[0.0, 0.0, 0.0], [5.0, 0.0, 0.0]], dtype=np.float64)
     radii = np.array([1.0, 1.0], dtype=np.float64)
     return coords, radii
@@ -25,6 +45,8 @@ def two_non_overlapping_spheres():
 @pytest.fixture
 def two_overlapping_spheres():
     """Fixture for two overlapping spheres."""
+    import numpy as np
+
     coords = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]], dtype=np.float64)
     radii = np.array([1.0, 1.0], dtype=np.float64)
     return coords, radii
@@ -33,6 +55,7 @@ def two_overlapping_spheres():
 @pytest.fixture
 def analytical_sphere_volume():
     """Fixture that returns a function to calculate analytical sphere volume."""
+    import math
 
     def volume_func(radius):
         return (4.0 / 3.0) * math.pi * (radius**3)
@@ -40,6 +63,26 @@ def analytical_sphere_volume():
     return volume_func
 
 
+@pytest.fixture(scope="module")
+def ref_volume():
+    """Fixture that returns a function giving the grid volume of one sphere at the origin.
+
+    Results are cached per (radius, grid_spacing), so tests comparing against the same
+    reference sphere rasterize it only once per module.
+    """
+    from pyvolgrid import volume_from_spheres
+
+    cache = {}
+
+    def volume_func(radius, grid_spacing):
+        key = (radius, grid_spacing)
+        if key not in cache:
+            cache[key] = volume_from_spheres([[0.0, 0.0, 0.0]], [radius], grid_spacing=grid_spacing)
+        return cache[key]
+
+    return volume_func
+
+
 @pytest.fixture
 def default_grid_spacing():
     """Default grid spacing for tests."""
@@ -60,6 +103,8 @@ def assert_relative_error(actual, expected, max_error=0.1, message=""):
 
 def create_random_spheres(n_spheres, seed=42, coord_range=(-2, 2), radius_range=(0.1, 1.0)):
     """Helper function to create random spheres for testing."""
+    import numpy as np
+
     np.random.seed(seed)
     coords = np.random.uniform(coord_range[0], coord_range[1], size=(n_spheres, 3))
     radii = np.random.uniform(radius_range[0], radius_range[1], size=n_spheres)
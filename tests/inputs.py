@@ -0,0 +1,12 @@
+"""Input arrays shared by several test modules.
+
+They are built once at import and are read-only, so no test can change them for the others.
+"""
+
+import numpy as np
+
+ORIGIN = np.array([[0.0, 0.0, 0.0]])
+ORIGIN.setflags(write=False)
+
+UNIT_RADIUS = np.array([1.0])
+UNIT_RADIUS.setflags(write=False)
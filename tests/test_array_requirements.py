@@ -1,12 +1,102 @@
 """Tests for automatic array conversion and requirements in PyVolGrid."""
 
 import numpy as np
+import pytest
 
+import pyvolgrid
 from pyvolgrid import volume_from_spheres
 
 
+@pytest.fixture
+def backend_calls(monkeypatch):
+    """Replace the compiled backends by a stub that records the arrays handed to them."""
+    calls = []
+
+    def fake_backend(coords, radii, grid_spacing, exact_when_disjoint=False):
+        calls.append((coords, radii))
+        return 1.0
+
+    monkeypatch.setattr(pyvolgrid, "_BACKEND", "cpp")
+    for name in (
+        "_volume_from_spheres_float32",
+        "_volume_from_spheres_float64",
+        "_volume_from_spheres_scalar_radius_float32",
+        "_volume_from_spheres_scalar_radius_float64",
+    ):
+        monkeypatch.setattr(pyvolgrid, name, fake_backend)
+    return calls
+
+
+class TestArrayConversion:
+    """Test the arrays the wrapper hands to the backend, without running the grid calculation."""
+
+    def test_c_contiguous_arrays_passed_through(self, backend_calls):
+        """Test that C-contiguous float arrays reach the backend without being copied."""
+        for dtype in (np.float32, np.float64):
+            coords = np.array([[0.0, 0.0, 0.0]], dtype=dtype)
+            radii = np.array([1.0], dtype=dtype)
+
+            volume_from_spheres(coords, radii)
+            assert backend_calls[-1][0] is coords
+            assert backend_calls[-1][1] is radii
+
+    @pytest.mark.parametrize(
+        "coords_dtype, radii, expected",
+        [
+            (np.float32, np.array([1.0], dtype=np.float32), np.float32),
+            (np.float32, 1.0, np.float32),
+            (np.float32, np.array([1.0], dtype=np.float64), np.float64),
+            (np.float32, np.float64(1.0), np.float64),
+            (np.int64, 1.0, np.float64),
+        ],
+        ids=["f32_f32", "f32_python_float", "f32_f64", "f32_numpy_f64_scalar", "int64_python_float"],
+    )
+    def test_dtype_dispatch(self, backend_calls, coords_dtype, radii, expected):
+        """Test the backend dtype chosen for combinations of input types."""
+        volume_from_spheres(np.zeros((1, 3), dtype=coords_dtype), radii)
+        assert backend_calls[-1][0].dtype == expected
+
+    def test_non_contiguous_arrays_made_contiguous(self, backend_calls):
+        """Test that non-contiguous coords and radii are copied into C-contiguous arrays."""
+        large_coords = np.array([[0.0, 0.0, 0.0, 999.0], [1.0, 1.0, 1.0, 999.0]], dtype=np.float64)
+        large_radii = np.array([1.0, 999.0, 2.0, 999.0], dtype=np.float64)
+
+        volume_from_spheres(large_coords[:, :3], large_radii[::2])
+        coords, radii = backend_calls[-1]
+        assert coords.flags.c_contiguous and coords.strides == (24, 8)
+        assert radii.flags.c_contiguous and radii.strides == (8,)
+        np.testing.assert_array_equal(coords, large_coords[:, :3])
+        np.testing.assert_array_equal(radii, [1.0, 2.0])
+
+    def test_fortran_order_made_c_contiguous(self, backend_calls):
+        """Test that Fortran-ordered coords are converted to C order."""
+        coords_f = np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]], dtype=np.float64, order="F")
+
+        volume_from_spheres(coords_f, [1.0, 1.0])
+        coords, _ = backend_calls[-1]
+        assert coords.flags.c_contiguous
+        np.testing.assert_array_equal(coords, coords_f)
+
+    def test_mixed_dtypes_promoted(self, backend_calls):
+        """Test that float32 coords with float64 radii are both passed as float64."""
+        large_coords = np.array([[0.0, 0.0, 0.0, 999.0], [1.0, 1.0, 1.0, 999.0]], dtype=np.float32)
+
+        volume_from_spheres(large_coords[:, :3], np.array([1.0, 1.0], dtype=np.float64))
+        coords, radii = backend_calls[-1]
+        assert coords.dtype == np.float64 and coords.flags.c_contiguous
+        assert radii.dtype == np.float64
+
+    def test_integer_arrays_converted_to_float64(self, backend_calls):
+        """Test that integer arrays are converted to float64."""
+        volume_from_spheres(np.array([[0, 0, 0]], dtype=np.int32), np.array([1], dtype=np.int64))
+        coords, radii = backend_calls[-1]
+        assert coords.dtype == np.float64
+        assert radii.dtype == np.float64
+
+
+@pytest.mark.slow
 class TestArrayRequirements:
-    """Test automatic array conversion and compatibility."""
+    """Test automatic array conversion and compatibility end to end."""
 
     def test_c_contiguous_arrays_accepted(self):
         """Test that C-contiguous float64 arrays are accepted."""
@@ -0,0 +1,43 @@
+"""Tests for the optional Numba CUDA backend in PyVolGrid."""
+
+import numpy as np
+import pytest
+
+import pyvolgrid
+
+cuda_backend = pytest.importorskip("pyvolgrid._cuda_backend", exc_type=ImportError)
+
+# Runs on a GPU, or on the Numba CUDA simulator with NUMBA_ENABLE_CUDASIM=1
+requires_cuda = pytest.mark.skipif(not cuda_backend.cuda.is_available(), reason="no CUDA device available")
+
+
+class TestCudaBackend:
+    """Test the CUDA kernel and when it is used."""
+
+    @requires_cuda
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_matches_cpp_backend(self, dtype):
+        """Test that the CUDA kernel counts the same grid points as the C++ backend."""
+        rng = np.random.default_rng(3)
+        coords = rng.uniform(-1, 1, size=(4, 3)).astype(dtype)
+        radii = rng.uniform(0.2, 0.6, size=4).astype(dtype)
+
+        expected = pyvolgrid.volume_from_spheres(coords, radii, grid_spacing=0.1)
+        assert cuda_backend.volume_from_spheres(coords, radii, 0.1) == expected
+
+    def test_small_grids_stay_on_cpu(self):
+        """Test that small grids and invalid input are left to the C++ backend."""
+        coords = np.zeros((2, 3))
+
+        assert not cuda_backend.is_worthwhile(coords, np.ones(2), 0.1)
+        assert not cuda_backend.is_worthwhile(coords[:, :2], np.ones(2), 0.001)
+        assert not cuda_backend.is_worthwhile(coords, np.ones(2), 0.0)
+
+    def test_selected_for_large_grids(self, monkeypatch):
+        """Test that volume_from_spheres dispatches to the CUDA kernel when it is worthwhile."""
+        monkeypatch.setattr(pyvolgrid, "_BACKEND", "cuda")
+        monkeypatch.setattr(cuda_backend, "is_worthwhile", lambda c, r, g: True)
+        monkeypatch.setattr(cuda_backend, "volume_from_spheres", lambda c, r, g: -1.0)
+
+        assert pyvolgrid.volume_from_spheres([[0.0, 0.0, 0.0]], 1.0) == -1.0
+        assert pyvolgrid.volume_from_spheres([[0.0, 0.0, 0.0]], 1.0, exact_when_disjoint=True) > 0.0
@@ -3,6 +3,7 @@
 import numpy as np
 import pytest
 
+import pyvolgrid
 from pyvolgrid import volume_from_spheres
 
 
@@ -98,15 +99,14 @@ class TestFlexibleInterface:
 
         # Compare with analytical solution
         analytical = (4.0 / 3.0) * np.pi * (1.0**3)
-        relative_error = abs(result - analytical) / analytical
-        assert relative_error < 0.1  # Within 10%
+        np.testing.assert_allclose(result, analytical, rtol=0.1)  # Within 10%
 
     def test_empty_input_handling(self):
         """Test handling of empty inputs."""
         coords = []
         radii = []
 
-        # Now catches the error earlier in Python validation
+        # Rejected by the input validation before any grid work is done
         with pytest.raises(
             ValueError,
             match="coords must have shape \\(N, 3\\), got shape \\(0,\\)",
@@ -181,6 +181,18 @@ class TestFlexibleInterface:
         assert isinstance(result, float)
         assert result > 0
 
+    def test_grid_spacing_numeric_types(self):
+        """Test that the backends accept any numeric grid spacing without a cast in Python."""
+        for dtype in (np.float32, np.float64):
+            coords = np.array([[0.0, 0.0, 0.0]], dtype=dtype)
+            radii = np.array([1.0], dtype=dtype)
+            reference = volume_from_spheres(coords, radii, grid_spacing=0.25)
+
+            assert volume_from_spheres(coords, radii, grid_spacing=np.float32(0.25)) == reference
+            assert volume_from_spheres(coords, radii, grid_spacing=np.float64(0.25)) == reference
+            assert volume_from_spheres(coords, 1.0, grid_spacing=np.float32(0.25)) == reference
+        assert volume_from_spheres([[0, 0, 0]], 1.0, grid_spacing=1) > 0
+
     def test_scalar_radius_single_sphere(self):
         """Test scalar radius with single sphere."""
         coords = [[0, 0, 0]]
@@ -194,8 +206,7 @@ class TestFlexibleInterface:
 
         # Compare with analytical solution for single sphere
         analytical = (4.0 / 3.0) * np.pi * (1.0**3)
-        relative_error = abs(result - analytical) / analytical
-        assert relative_error < 0.1  # Within 10%
+        np.testing.assert_allclose(result, analytical, rtol=0.1)  # Within 10%
 
     def test_scalar_radius_multiple_spheres(self):
         """Test scalar radius with multiple spheres."""
@@ -245,6 +256,25 @@ class TestFlexibleInterface:
         assert isinstance(result, float)
         assert result > 0
 
+    def test_scalar_radius_zero_dimensional_array(self):
+        """Test that a 0-d array is treated as a scalar radius."""
+        coords = [[0, 0, 0], [2, 0, 0]]
+
+        result = volume_from_spheres(coords, np.array(1.0))
+        assert result == volume_from_spheres(coords, 1.0)
+
+    def test_scalar_radius_not_expanded(self, monkeypatch):
+        """Test that a scalar radius is passed to the backend without building a radii array."""
+        passed = []
+        monkeypatch.setattr(pyvolgrid, "_BACKEND", "cpp")
+        monkeypatch.setattr(
+            pyvolgrid, "_volume_from_spheres_scalar_radius_float64", lambda c, r, g, e: passed.append(r) or 1.0
+        )
+        coords = np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]], dtype=np.float64)
+
+        volume_from_spheres(coords, 0.8)
+        assert passed == [0.8]
+
     def test_scalar_radius_zero_valid(self):
         """Test scalar radius of zero (mathematically valid)."""
         coords = [[0, 0, 0], [1, 0, 0]]
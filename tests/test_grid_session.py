@@ -0,0 +1,70 @@
+"""Tests for the reusable grid session in PyVolGrid."""
+
+import numpy as np
+import pytest
+
+from pyvolgrid import VolumeGridSession, volume_from_spheres
+
+
+class TestVolumeGridSession:
+    """Test volume calculations on a preallocated grid."""
+
+    def test_matches_volume_from_spheres(self):
+        """Test that a session gives the same volume as a one-off calculation."""
+        coords = np.array([[0.0, 0.0, 0.0], [1.5, 0.0, 0.0]])
+        radii = np.array([1.0, 1.0])
+        session = VolumeGridSession([[-3.0, -3.0, -3.0], [5.0, 3.0, 3.0]], grid_spacing=0.1)
+
+        assert session.volume(coords, radii) == volume_from_spheres(coords, radii, grid_spacing=0.1)
+
+    def test_grid_is_reset_between_calls(self):
+        """Test that repeated calculations do not see spheres from earlier calls."""
+        session = VolumeGridSession([[-3.0, -3.0, -3.0], [3.0, 3.0, 3.0]], grid_spacing=0.1)
+
+        small = session.volume([[0.0, 0.0, 0.0]], 0.5)
+        large = session.volume([[0.0, 0.0, 0.0]], 2.0)
+        assert large > small
+        assert session.volume([[0.0, 0.0, 0.0]], 0.5) == small
+
+    def test_scalar_radius(self):
+        """Test that a scalar radius gives the same volume as an array of equal radii."""
+        coords = np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]])
+        session = VolumeGridSession([[-2.0, -2.0, -2.0], [3.0, 3.0, 3.0]], grid_spacing=0.1)
+
+        assert session.volume(coords, 0.8) == session.volume(coords, np.array([0.8, 0.8]))
+
+    def test_spheres_outside_bbox_are_ignored(self):
+        """Test that only the part of the spheres inside the bounding box counts."""
+        session = VolumeGridSession([[0.0, -2.0, -2.0], [2.0, 2.0, 2.0]], grid_spacing=0.1)
+        full = volume_from_spheres([[0.0, 0.0, 0.0]], 1.0, grid_spacing=0.1)
+
+        assert session.volume([[100.0, 0.0, 0.0]], 1.0) == 0.0
+        assert session.volume([[-100.0, 0.0, 0.0]], 1.0) == 0.0
+        assert 0.4 * full < session.volume([[0.0, 0.0, 0.0]], 1.0) < 0.6 * full
+
+    def test_float32_session(self):
+        """Test a session calculating in single precision."""
+        session = VolumeGridSession([[-2.0, -2.0, -2.0], [2.0, 2.0, 2.0]], grid_spacing=0.1, dtype=np.float32)
+        analytical = (4.0 / 3.0) * np.pi
+
+        result = session.volume([[0.0, 0.0, 0.0]], [1.0])
+        assert isinstance(result, float)
+        assert abs(result - analytical) / analytical < 0.1
+
+    def test_invalid_arguments(self):
+        """Test that invalid session parameters raise ValueError."""
+        with pytest.raises(ValueError, match="bbox must have shape \\(2, 3\\), got shape \\(3,\\)"):
+            VolumeGridSession([0.0, 0.0, 0.0])
+        with pytest.raises(ValueError, match="bbox upper corner must not be below the lower corner"):
+            VolumeGridSession([[1.0, 0.0, 0.0], [0.0, 1.0, 1.0]])
+        with pytest.raises(ValueError, match="grid_spacing must be greater than 0.0"):
+            VolumeGridSession([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]], grid_spacing=0.0)
+        with pytest.raises(ValueError, match="dtype must be float32 or float64"):
+            VolumeGridSession([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]], dtype=np.int32)
+
+    def test_invalid_sphere_input(self):
+        """Test that sphere input is validated like in volume_from_spheres."""
+        session = VolumeGridSession([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]])
+
+        with pytest.raises(ValueError, match="Number of radii \\(1\\) must match number of coordinates \\(2\\)"):
+            session.volume([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]], [1.0])
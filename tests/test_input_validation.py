@@ -3,7 +3,9 @@
 import numpy as np
 import pytest
 
-from pyvolgrid import volume_from_spheres
+from pyvolgrid import _core, volume_from_spheres
+
+from .inputs import ORIGIN, UNIT_RADIUS
 
 
 class TestInputValidation:
@@ -11,8 +13,8 @@ class TestInputValidation:
 
     def test_valid_input_single_sphere(self):
         """Test that valid input for a single sphere works."""
-        coords = np.array([[0.0, 0.0, 0.0]])
-        radii = np.array([1.0])
+        coords = ORIGIN
+        radii = UNIT_RADIUS
         result = volume_from_spheres(coords, radii, grid_spacing=0.1)
         assert isinstance(result, float)
         assert result > 0
@@ -25,107 +27,75 @@ class TestInputValidation:
         assert isinstance(result, float)
         assert result > 0
 
-    def test_coords_wrong_dimensions_1d(self):
-        """Test that 1D coords array raises ValueError."""
-        coords = np.array([0.0, 0.0, 0.0])  # Should be (1, 3)
-        radii = np.array([1.0])
-
-        with pytest.raises(
-            ValueError,
-            match="coords must have shape \\(N, 3\\), got shape \\(3,\\)",
-        ):
+    @pytest.mark.fast
+    @pytest.mark.parametrize(
+        "coords, match",
+        [
+            (np.array([0.0, 0.0, 0.0]), "coords must have shape \\(N, 3\\), got shape \\(3,\\)"),
+            (np.array([[[0.0, 0.0, 0.0]]]), "coords must have shape \\(N, 3\\), got shape \\(1, 1, 3\\)"),
+            (np.array([[0.0, 0.0]]), "coords must have shape \\(N, 3\\), got shape \\(1, 2\\)"),
+            (np.array([[0.0, 0.0, 0.0, 0.0]]), "coords must have shape \\(N, 3\\), got shape \\(1, 4\\)"),
+        ],
+        ids=["1d", "3d", "two_columns", "four_columns"],
+    )
+    def test_coords_wrong_shape(self, coords, match):
+        """Test that coords not of shape (N, 3) raise ValueError."""
+        with pytest.raises(ValueError, match=match):
+            volume_from_spheres(coords, UNIT_RADIUS)
+
+    @pytest.mark.fast
+    @pytest.mark.parametrize(
+        "coords, radii, match",
+        [
+            (ORIGIN, np.array([[1.0]]), "radii must be 1-dimensional, got shape \\(1, 1\\)"),
+            (
+                np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]]),
+                UNIT_RADIUS,
+                "Number of radii \\(1\\) must match number of coordinates \\(2\\)",
+            ),
+            (
+                ORIGIN,
+                np.array([1.0, 0.5]),
+                "Number of radii \\(2\\) must match number of coordinates \\(1\\)",
+            ),
+        ],
+        ids=["radii_2d", "fewer_radii", "more_radii"],
+    )
+    def test_radii_wrong_shape(self, coords, radii, match):
+        """Test that radii not matching the coords raise ValueError."""
+        with pytest.raises(ValueError, match=match):
             volume_from_spheres(coords, radii)
 
-    def test_coords_wrong_dimensions_3d(self):
-        """Test that 3D coords array raises ValueError."""
-        coords = np.array([[[0.0, 0.0, 0.0]]])  # Should be (1, 3)
-        radii = np.array([1.0])
-
-        with pytest.raises(
-            ValueError,
-            match="coords must have shape \\(N, 3\\), got shape \\(1, 1, 3\\)",
-        ):
-            volume_from_spheres(coords, radii)
-
-    def test_coords_wrong_second_dimension(self):
-        """Test that coords with wrong second dimension raises ValueError."""
-        coords = np.array([[0.0, 0.0]])  # Should have 3 columns, not 2
-        radii = np.array([1.0])
-
-        with pytest.raises(
-            ValueError,
-            match="coords must have shape \\(N, 3\\), got shape \\(1, 2\\)",
-        ):
-            volume_from_spheres(coords, radii)
-
-    def test_coords_four_dimensions(self):
-        """Test that coords with 4 dimensions instead of 3 raises ValueError."""
-        coords = np.array([[0.0, 0.0, 0.0, 0.0]])  # Should have 3 columns, not 4
-        radii = np.array([1.0])
-
-        with pytest.raises(
-            ValueError,
-            match="coords must have shape \\(N, 3\\), got shape \\(1, 4\\)",
-        ):
-            volume_from_spheres(coords, radii)
-
-    def test_radii_wrong_dimensions_2d(self):
-        """Test that 2D radii array raises ValueError."""
-        coords = np.array([[0.0, 0.0, 0.0]])
-        radii = np.array([[1.0]])  # Should be 1D
-
-        with pytest.raises(
-            ValueError,
-            match="radii must be 1-dimensional, got shape \\(1, 1\\)",
-        ):
-            volume_from_spheres(coords, radii)
-
-    def test_mismatched_array_sizes(self):
-        """Test that mismatched coords and radii sizes raise ValueError."""
-        coords = np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]])  # 2 spheres
-        radii = np.array([1.0])  # Only 1 radius
-
-        with pytest.raises(
-            ValueError,
-            match="Number of radii \\(1\\) must match number of coordinates \\(2\\)",
-        ):
-            volume_from_spheres(coords, radii)
-
-    def test_more_radii_than_coords(self):
-        """Test that more radii than coords raises ValueError."""
-        coords = np.array([[0.0, 0.0, 0.0]])  # 1 sphere
-        radii = np.array([1.0, 0.5])  # 2 radii
-
-        with pytest.raises(
-            ValueError,
-            match="Number of radii \\(2\\) must match number of coordinates \\(1\\)",
-        ):
-            volume_from_spheres(coords, radii)
-
-    def test_zero_grid_spacing(self):
-        """Test that zero grid spacing raises ValueError."""
-        coords = np.array([[0.0, 0.0, 0.0]])
-        radii = np.array([1.0])
-
-        with pytest.raises(ValueError, match="grid_spacing must be greater than 0.0"):
-            volume_from_spheres(coords, radii, grid_spacing=0.0)
-
-    def test_negative_grid_spacing(self):
-        """Test that negative grid spacing raises ValueError."""
-        coords = np.array([[0.0, 0.0, 0.0]])
-        radii = np.array([1.0])
+    @pytest.mark.fast
+    @pytest.mark.parametrize("grid_spacing", [0.0, -0.1])
+    def test_non_positive_grid_spacing(self, grid_spacing):
+        """Test that a zero or negative grid spacing raises ValueError."""
+        coords = ORIGIN
+        radii = UNIT_RADIUS
 
         with pytest.raises(ValueError, match="grid_spacing must be greater than 0.0"):
-            volume_from_spheres(coords, radii, grid_spacing=-0.1)
+            volume_from_spheres(coords, radii, grid_spacing=grid_spacing)
 
+    @pytest.mark.fast
     def test_empty_arrays(self):
         """Test behavior with empty arrays."""
         coords = np.array([]).reshape(0, 3)
         radii = np.array([])
-        # Empty arrays are now caught by Python validation before reaching C++
+        # Empty arrays are rejected by the input validation before any grid work is done
         with pytest.raises(ValueError, match="coords must contain at least one coordinate"):
             volume_from_spheres(coords, radii)
 
+    @pytest.mark.fast
+    def test_backend_validates_shapes(self):
+        """Test that the compiled backend rejects malformed arrays on its own."""
+        coords = np.zeros((2, 3), dtype=np.float64)
+        radii = np.ones(3, dtype=np.float64)
+
+        with pytest.raises(ValueError, match="Number of radii \\(3\\) must match number of coordinates \\(2\\)"):
+            _core._volume_from_spheres_float64(coords, radii, 0.1)
+        with pytest.raises(ValueError, match="coords must have shape \\(N, 3\\), got shape \\(6,\\)"):
+            _core._volume_from_spheres_scalar_radius_float64(coords.ravel(), 1.0, 0.1)
+
     def test_numpy_array_types(self):
         """Test that function now automatically converts different array types."""
         # The function now automatically converts to float64
@@ -153,8 +123,8 @@ class TestInputValidation:
 
     def test_very_small_positive_grid_spacing(self):
         """Test with very small but positive grid spacing."""
-        coords = np.array([[0.0, 0.0, 0.0]])
-        radii = np.array([1.0])
+        coords = ORIGIN
+        radii = UNIT_RADIUS
         # Use a small but reasonable grid spacing to avoid memory issues
         result = volume_from_spheres(coords, radii, grid_spacing=0.01)
         assert isinstance(result, float)
@@ -163,7 +133,7 @@ class TestInputValidation:
     def test_scalar_radius_input_validation(self):
         """Test that scalar radius input is properly validated."""
         # Valid case
-        coords = np.array([[0.0, 0.0, 0.0]])
+        coords = ORIGIN
         radius = 1.0
         result = volume_from_spheres(coords, radius)
         assert isinstance(result, float)
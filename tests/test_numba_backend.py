@@ -0,0 +1,69 @@
+"""Tests for the optional Numba backend in PyVolGrid."""
+
+import numpy as np
+import pytest
+
+import pyvolgrid
+
+numba_backend = pytest.importorskip("pyvolgrid._numba_backend", exc_type=ImportError)
+
+
+class TestNumbaBackend:
+    """Test that the Numba kernel agrees with the C++ backend."""
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_matches_cpp_backend(self, dtype):
+        """Test that both backends count the same grid points."""
+        rng = np.random.default_rng(42)
+        coords = rng.uniform(-3, 3, size=(20, 3)).astype(dtype)
+        radii = rng.uniform(0.2, 1.2, size=20).astype(dtype)
+
+        expected = pyvolgrid.volume_from_spheres(coords, radii, grid_spacing=0.1)
+        assert numba_backend.volume_from_spheres(coords, radii, 0.1) == expected
+
+    def test_scalar_radius(self):
+        """Test that a scalar radius is applied to every sphere."""
+        coords = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+
+        expected = pyvolgrid.volume_from_spheres(coords, 0.8, grid_spacing=0.1)
+        assert numba_backend.volume_from_spheres(coords, 0.8, 0.1) == expected
+
+    def test_scalar_radius_not_expanded(self, monkeypatch):
+        """Test that a scalar radius reaches the kernel as a broadcast view instead of an N-long copy."""
+        passed = []
+        kernel = numba_backend._count_points_in_spheres
+        monkeypatch.setattr(
+            numba_backend, "_count_points_in_spheres", lambda c, r, h: passed.append(r) or kernel(c, r, h)
+        )
+
+        numba_backend.volume_from_spheres(np.zeros((4, 3)), 1.0, 0.1)
+        assert passed[0].strides == (0,)
+
+    def test_invalid_input(self):
+        """Test that invalid input raises the same errors as the C++ backend."""
+        coords = np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]])
+
+        with pytest.raises(ValueError, match="Number of radii \\(1\\) must match number of coordinates \\(2\\)"):
+            numba_backend.volume_from_spheres(coords, np.array([1.0]), 0.1)
+        with pytest.raises(ValueError, match="grid_spacing must be greater than 0.0"):
+            numba_backend.volume_from_spheres(coords, 1.0, 0.0)
+        with pytest.raises(ValueError, match="coords must contain at least one coordinate"):
+            numba_backend.volume_from_spheres(np.empty((0, 3)), np.empty(0), 0.1)
+
+    def test_selected_by_backend_setting(self, monkeypatch):
+        """Test that volume_from_spheres dispatches to the Numba kernel when selected."""
+        calls = []
+        monkeypatch.setattr(pyvolgrid, "_BACKEND", "numba")
+        monkeypatch.setattr(numba_backend, "volume_from_spheres", lambda c, r, g: calls.append((c, r, g)) or 1.0)
+
+        assert pyvolgrid.volume_from_spheres([[0.0, 0.0, 0.0]], 1.0, grid_spacing=0.2) == 1.0
+        assert calls[0][1:] == (1.0, 0.2)
+
+    def test_exact_when_disjoint_uses_cpp_backend(self, monkeypatch):
+        """Test that the analytical shortcut falls back to the C++ backend."""
+        coords = np.array([[0.0, 0.0, 0.0], [5.0, 0.0, 0.0]])
+        radii = np.array([1.0, 0.5])
+        expected = pyvolgrid.volume_from_spheres(coords, radii, exact_when_disjoint=True)
+
+        monkeypatch.setattr(pyvolgrid, "_BACKEND", "numba")
+        assert pyvolgrid.volume_from_spheres(coords, radii, exact_when_disjoint=True) == expected